@@ -0,0 +1,323 @@
+# bingkit-ffxiv 벤치마크
+# 가짜 입력으로 주요 경로를 하나씩 따로 실행해서 시간과 최대 메모리(RSS)를 잰다.
+# 벤치마크마다 새 프로세스를 띄우므로 서로의 캐시나 메모리에 영향을 주지 않는다.
+#
+#   python benchmarks/bench.py run --scale small
+#   python benchmarks/bench.py compare benchmarks/results/OLD.json benchmarks/results/NEW.json
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from contextlib import ExitStack
+from dataclasses import asdict
+from datetime import UTC, datetime
+from pathlib import Path
+
+here = Path(__file__).parent
+FIXTURES_DIR = here / ".fixtures"
+RESULTS_DIR = here / "results"
+
+# 준비한 뒤 시간을 잴 함수와, 매번 실행하기 전에 부를 함수(없으면 None)
+Prepared = tuple[Callable[[], object], Callable[[], object] | None]
+
+
+def bench_get_csv(root: Path, stack: ExitStack, variant: str) -> Prepared:
+    from fixtures import serve
+
+    from bingkit.ffxiv._base import download_session, get_csv
+
+    base_url = stack.enter_context(serve(root / "csv"))
+    url = f"{base_url}/{variant}/Action.csv"
+
+    async def run() -> None:
+        async with download_session():
+            await get_csv(url, ["#", "Name"])
+
+    return lambda: asyncio.run(run()), None
+
+
+def bench_get_csv_typed(root: Path, work: Path, stack: ExitStack) -> Prepared:
+    return bench_get_csv(root, stack, "typed")
+
+
+def bench_get_csv_plain(root: Path, work: Path, stack: ExitStack) -> Prepared:
+    return bench_get_csv(root, stack, "plain")
+
+
+def bench_parse_log(root: Path, work: Path, stack: ExitStack) -> Prepared:
+    from bingkit.ffxiv.rsv import parse_log
+
+    log = root / "log" / "Network_00000_20260101.log"
+    save_path = work / "rsv.json"
+    return lambda: parse_log([str(log)], save_path), None
+
+
+def bench_raidboss_parse(root: Path, work: Path, stack: ExitStack) -> Prepared:
+    from bingkit.ffxiv.raidboss.raidboss import fetch, parse
+
+    data = fetch(str(root / "timeline" / "bench.ts"))
+    return lambda: parse(data), None
+
+
+def bench_raidboss_i18n(root: Path, work: Path, stack: ExitStack) -> Prepared:
+    from bingkit.ffxiv.raidboss.raidboss import fetch, parse, to_i18n_data
+
+    coinach = work / "coinach"
+    shutil.copytree(root / "coinach", coinach)
+    parsed = parse(fetch(str(root / "timeline" / "bench.ts")))
+    # 인덱스를 미리 만들어서 찾는 시간만 잰다
+    to_i18n_data(parsed, coinach)
+    return lambda: to_i18n_data(parsed, coinach), None
+
+
+def bench_replace_one(root: Path, work: Path, stack: ExitStack) -> Prepared:
+    from bingkit.ffxiv.rsv.replace import get_rsv_mapping, mapping_frame, replace_one
+
+    source = root / "data" / "Action.parquet"
+    target = work / "Action.parquet"
+    mapping = mapping_frame(get_rsv_mapping(root / "rsv.json"))
+    # 바꾼 파일을 다음 실행 전에 원래대로 돌려놓는다
+    return lambda: replace_one(target, mapping), lambda: shutil.copy(source, target)
+
+
+def bench_make_df(root: Path, work: Path, stack: ExitStack) -> Prepared:
+    from fixtures import serve
+
+    import bingkit.ffxiv._base as base
+    from bingkit.ffxiv._base import OutputFormat, download_session
+    from bingkit.ffxiv.rsv.replace import get_rsv_mapping, mapping_frame
+    from bingkit.ffxiv.scrap.scrapper import make_df
+
+    base_url = stack.enter_context(serve(root / "csv"))
+    for lang in ("en", "ko"):
+        base.BASE_URL[lang] = f"{base_url}/{lang}/{{name}}.csv"
+    mapping = mapping_frame(get_rsv_mapping(root / "rsv.json"))
+
+    async def run() -> None:
+        async with download_session():
+            await make_df("Action", ["Name"], work, [OutputFormat.ipc], mapping)
+
+    return lambda: asyncio.run(run()), None
+
+
+def bench_compare(root: Path, work: Path, stack: ExitStack) -> Prepared:
+    from bingkit.ffxiv.compare import compare
+
+    input_file = root / "compare" / "input.txt"
+    output_file = work / "output.txt"
+    return lambda: compare(input_file, output_file, root / "data"), None
+
+
+BENCHMARKS: dict[str, Callable[[Path, Path, ExitStack], Prepared]] = {
+    "get_csv[typed]": bench_get_csv_typed,
+    "get_csv[plain]": bench_get_csv_plain,
+    "parse_log": bench_parse_log,
+    "raidboss.parse": bench_raidboss_parse,
+    "raidboss.to_i18n_data": bench_raidboss_i18n,
+    "replace_one": bench_replace_one,
+    "scrap.make_df": bench_make_df,
+    "compare": bench_compare,
+}
+
+
+def peak_rss() -> int | None:
+    # 리눅스는 /proc의 VmHWM, 나머지는 getrusage
+    try:
+        with Path("/proc/self/status").open(encoding="ascii") as file:
+            for line in file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def reset_peak_rss() -> bool:
+    # 준비 과정의 메모리를 빼기 위해 최대값을 지금 값으로 되돌린다 (리눅스만)
+    try:
+        with Path("/proc/self/clear_refs").open("w", encoding="ascii") as file:
+            file.write("5")
+    except OSError:
+        return False
+    return True
+
+
+def child(name: str, root: Path, repeat: int) -> dict[str, object]:
+    from loguru import logger
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    with tempfile.TemporaryDirectory() as tmp, ExitStack() as stack:
+        run, before = BENCHMARKS[name](root, Path(tmp), stack)
+        baseline = peak_rss()
+        reset = reset_peak_rss()
+        times = []
+        for _ in range(repeat):
+            if before is not None:
+                before()
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+        peak = peak_rss()
+    mb = 1024**2
+    return {
+        "times": times,
+        "min": min(times),
+        "median": statistics.median(times),
+        "peak_rss_mb": None if peak is None else round(peak / mb, 1),
+        # 준비 과정을 빼지 못했으면 준비 과정의 최대값도 섞여 있다
+        "setup_rss_mb": None if baseline is None else round(baseline / mb, 1),
+        "peak_excludes_setup": reset,
+    }
+
+
+def git(*args: str) -> str | None:
+    try:
+        proc = subprocess.run(
+            ["git", *args], capture_output=True, text=True, check=True, cwd=here
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return proc.stdout.strip()
+
+
+def run(args: argparse.Namespace) -> int:
+    from fixtures import SCALES, generate
+
+    scale = SCALES[args.scale]
+    root = FIXTURES_DIR / args.scale
+    print(f"generating fixtures in {root} ...", file=sys.stderr)
+    generate(root, scale)
+
+    names = [
+        name for name in BENCHMARKS if not args.k or any(k in name for k in args.k)
+    ]
+    results = {}
+    for name in names:
+        proc = subprocess.run(
+            [sys.executable, __file__, "child", name, str(root), str(args.repeat)],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        if proc.returncode != 0:
+            print(f"{name}: failed\n{proc.stderr}", file=sys.stderr)
+            lines = proc.stderr.strip().splitlines()
+            results[name] = {"error": lines[-1] if lines else f"exit {proc.returncode}"}
+            continue
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        results[name] = result
+        print(
+            f"{name:<24} median {result['median'] * 1000:10.1f} ms"
+            f"  min {result['min'] * 1000:10.1f} ms  peak {result['peak_rss_mb']} MB",
+            file=sys.stderr,
+        )
+
+    commit = git("rev-parse", "--short", "HEAD")
+    report = {
+        "commit": commit,
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "created_at": datetime.now(UTC).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "scale": {"name": args.scale, **asdict(scale)},
+        "repeat": args.repeat,
+        "benchmarks": results,
+    }
+    output = args.output
+    if output is None:
+        output = RESULTS_DIR / f"{commit or 'unknown'}-{args.scale}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"results saved at {output}", file=sys.stderr)
+    return 0 if all("error" not in r for r in results.values()) else 1
+
+
+def compare(args: argparse.Namespace) -> int:
+    old = json.loads(args.old.read_text(encoding="utf-8"))
+    new = json.loads(args.new.read_text(encoding="utf-8"))
+    if old["scale"] != new["scale"]:
+        print("warning: results were made with different scales", file=sys.stderr)
+
+    print(
+        f"{'benchmark':<24} {'old ms':>10} {'new ms':>10} {'ratio':>7} {'old MB':>8} {'new MB':>8}"
+    )
+    regressed = []
+    for name, after in new["benchmarks"].items():
+        before = old["benchmarks"].get(name)
+        if before is None or "error" in before or "error" in after:
+            print(f"{name:<24} {'-':>10} {'-':>10}")
+            continue
+        ratio = after["median"] / before["median"]
+        mark = ""
+        if ratio > 1 + args.threshold:
+            mark = " slower"
+            regressed.append(name)
+        elif ratio < 1 - args.threshold:
+            mark = " faster"
+        print(
+            f"{name:<24} {before['median'] * 1000:>10.1f} {after['median'] * 1000:>10.1f}"
+            f" {ratio:>7.2f} {before['peak_rss_mb']!s:>8} {after['peak_rss_mb']!s:>8}{mark}"
+        )
+    if regressed:
+        print(f"{len(regressed)} regressions: {', '.join(regressed)}", file=sys.stderr)
+    return 1 if regressed else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="bingkit-ffxiv 벤치마크")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="벤치마크 실행")
+    run_parser.add_argument(
+        "--scale", choices=["tiny", "small", "medium", "large"], default="small"
+    )
+    run_parser.add_argument(
+        "--repeat", type=int, default=5, help="벤치마크마다 반복할 횟수"
+    )
+    run_parser.add_argument(
+        "-k", action="append", help="이름에 이 문자열이 들어간 것만 실행"
+    )
+    run_parser.add_argument("-o", "--output", type=Path, help="결과 json 파일 경로")
+
+    compare_parser = sub.add_parser("compare", help="두 결과 비교")
+    compare_parser.add_argument("old", type=Path)
+    compare_parser.add_argument("new", type=Path)
+    compare_parser.add_argument(
+        "--threshold", type=float, default=0.1, help="이 비율보다 느려지면 실패"
+    )
+
+    child_parser = sub.add_parser("child")
+    child_parser.add_argument("name", choices=list(BENCHMARKS))
+    child_parser.add_argument("root", type=Path)
+    child_parser.add_argument("repeat", type=int)
+
+    args = parser.parse_args()
+    if args.command == "child":
+        print(json.dumps(child(args.name, args.root, args.repeat)))
+        return 0
+    if args.command == "compare":
+        return compare(args)
+    return run(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
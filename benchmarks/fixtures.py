@@ -0,0 +1,235 @@
+# 벤치마크용 가짜 입력 생성
+# 실제 데이터와 비슷한 모양의 CSV, ACT 로그, cactbot 타임라인, RSV 정보를 만든다
+
+from __future__ import annotations
+
+import functools
+import http.server
+import json
+import random
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import polars as pl
+
+LANGS = ("en", "de", "fr", "ja", "cn", "ko", "tc")
+# 시트 이름, 텍스트 열
+SHEETS = {"Action": "Name", "BNpcName": "Singular", "PlaceName": "Name"}
+TIMESTAMP = "2026-01-01T00:00:00.0000000+09:00"
+
+
+@dataclass(frozen=True)
+class Scale:
+    csv_rows: int
+    log_mb: int
+    timeline_lines: int
+    rsv_entries: int
+    # 262 줄 하나당 다른 줄 수
+    log_sparsity: int = 2000
+
+
+SCALES = {
+    "tiny": Scale(csv_rows=2_000, log_mb=4, timeline_lines=200, rsv_entries=500),
+    "small": Scale(csv_rows=20_000, log_mb=64, timeline_lines=2_000, rsv_entries=5_000),
+    "medium": Scale(
+        csv_rows=100_000, log_mb=512, timeline_lines=10_000, rsv_entries=20_000
+    ),
+    "large": Scale(
+        csv_rows=500_000, log_mb=4096, timeline_lines=50_000, rsv_entries=100_000
+    ),
+}
+
+
+def rsv_key(i: int) -> str:
+    return f"_rsv_{i}_0_{i * 7 % 10_000}"
+
+
+def text(name: str, i: int, lang: str) -> str:
+    # 일부 셀은 RSV 값으로 남아 있다
+    if i % 97 == 0:
+        return rsv_key(i)
+    base = "Ability" if name == "Action" else "Boss" if name == "BNpcName" else "Zone"
+    return f"{base} {i}" if lang == "en" else f"{base} {i} ({lang})"
+
+
+def write_sheet_csv(
+    path: Path, name: str, rows: int, lang: str = "en", typed: bool = True
+) -> Path:
+    # typed: xivapi처럼 key/이름/형식 세 줄 헤더, 아니면 이름 한 줄 헤더
+    column = SHEETS[name]
+    header = ["#", column, "Icon", "ClassJob", "IsPvP"]
+    lines = []
+    if typed:
+        lines.append("key,0,1,2,3")
+        lines.append(",".join(header))
+        lines.append("int32,str,Image,ClassJob,bool")
+    else:
+        lines.append(",".join(header))
+    for i in range(rows):
+        value = text(name, i, lang).replace('"', '""')
+        lines.append(
+            f'{i},"{value}",{i % 5000},{i % 40},{"True" if i % 9 else "False"}'
+        )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+def write_act_log(path: Path, size_mb: int, sparsity: int = 2000) -> Path:
+    # 대부분은 다른 종류의 줄이고 262 줄이 드문드문 섞여 있는 로그
+    rng = random.Random(0)
+    filler = [
+        f"{kind}|{TIMESTAMP}|4000{i:04X}|Boss {i % 300}|{i % 5000:X}|Attack|"
+        f"{rng.randrange(1 << 32):08X}|0|0|0|{rng.randrange(1 << 64):016x}\n"
+        for i, kind in zip(range(sparsity), ("21", "22", "26", "37", "38") * sparsity)
+    ]
+    chunk = "".join(filler)
+    target = size_mb * 1024**2
+    written = 0
+    block = 0
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8", newline="\n") as file:
+        while written < target:
+            key = rsv_key(block)
+            rsv = f"262|{TIMESTAMP}|0|{block}|{key}|Value {block}\x02\x10\x01\x03line|{block:016x}\n"
+            data = chunk + rsv
+            file.write(data)
+            written += len(data.encode())
+            block += 1
+    return path
+
+
+def write_timeline(directory: Path, name: str, lines: int) -> Path:
+    # cactbot raidboss 파일: .ts에는 트리거, .txt에는 타임라인
+    directory.mkdir(parents=True, exist_ok=True)
+    ts = ["Options.Triggers.push({", f"  timelineFile: '{name}.txt',", "  triggers: ["]
+    txt = [
+        'hideall "--sync--"',
+        '0.0 "--sync--" InCombat { inGameCombat: "1" } window 0,1',
+    ]
+    for i in range(lines):
+        boss = f"Boss {i % 300}"
+        if i % 10 == 0:
+            ts.append(
+                f"    {{ id: 'Trigger {i}', type: 'StartsUsing', "
+                f"netRegex: {{ id: '{i:X}', source: '{boss}', capture: false }} }},"
+            )
+        if i % 50 == 0:
+            ts.append(
+                f"    {{ netRegex: {{ id: ['{i:X}', '{i + 1:X}'], target: '{boss}' }} }},"
+            )
+        action = f"Ability {i % 5000}"
+        if i % 7 == 0:
+            action += f"/Ability {(i + 1) % 5000}"
+        txt.append(
+            f'{i * 2.5:.1f} "{action} x2" Ability {{ id: "{i:X}", source: "{boss}" }}'
+        )
+        if i % 100 == 0:
+            txt.append(f'{i * 2.5:.1f} label "phase{i}"')
+    ts.extend(["  ],", "});"])
+    (directory / f"{name}.txt").write_text("\n".join(txt) + "\n", encoding="utf-8")
+    path = directory / f"{name}.ts"
+    path.write_text("\n".join(ts) + "\n", encoding="utf-8")
+    return path
+
+
+def write_compare_input(path: Path, lines: int) -> Path:
+    # compare 명령에 넣는 번역 전 타임라인 블록
+    out = ["    {", "      'locale': 'ko',", "      'replaceSync': {"]
+    out.extend(
+        f"        'Boss {i % 300}': 'Boss {i % 300}'," for i in range(lines // 2)
+    )
+    out.extend(f"        'Zone {i}': 'Zone {i}'," for i in range(lines // 10))
+    out.extend(["      },", "      'replaceText': {"])
+    out.extend(f"        'Ability {i}': 'Ability {i}'," for i in range(lines // 2))
+    out.extend(["      },", "    },"])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("\n".join(out) + "\n", encoding="utf-8")
+    return path
+
+
+def rsv_mapping(entries: int) -> dict[str, str]:
+    return {rsv_key(i): f"Value {i}" for i in range(0, entries * 97, 97)}
+
+
+def write_rsv_mapping(path: Path, entries: int) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        json.dumps(rsv_mapping(entries), ensure_ascii=False, indent=2), encoding="utf-8"
+    )
+    return path
+
+
+def sheet_frame(name: str, rows: int, langs: tuple[str, ...]) -> pl.DataFrame:
+    column = SHEETS[name]
+    data: dict[str, list] = {"#": list(range(rows))}
+    for lang in langs:
+        data[f"{column}_{lang}"] = [text(name, i, lang) for i in range(rows)]
+    return pl.DataFrame(data)
+
+
+def write_data_dir(directory: Path, rows: int) -> Path:
+    # scrap 결과처럼 en/ko를 합친 데이터 파일
+    directory.mkdir(parents=True, exist_ok=True)
+    for name in SHEETS:
+        sheet_frame(name, rows, ("en", "ko")).write_parquet(
+            directory / f"{name}.parquet"
+        )
+    return directory
+
+
+def write_coinach_dir(directory: Path, rows: int) -> Path:
+    # coinach 결과처럼 모든 언어를 합친 .all 파일
+    directory.mkdir(parents=True, exist_ok=True)
+    for name in ("Action", "BNpcName"):
+        sheet_frame(name, rows, LANGS).write_parquet(directory / f"{name}.all.parquet")
+    return directory
+
+
+def generate(root: Path, scale: Scale) -> Path:
+    # 같은 크기로 이미 만들었으면 다시 만들지 않는다
+    stamp = root / "scale.json"
+    if stamp.exists() and json.loads(stamp.read_text()) == asdict(scale):
+        return root
+    for name in SHEETS:
+        write_sheet_csv(root / "csv" / "typed" / f"{name}.csv", name, scale.csv_rows)
+        write_sheet_csv(
+            root / "csv" / "plain" / f"{name}.csv", name, scale.csv_rows, typed=False
+        )
+        # scrap이 받는 en, ko 시트
+        write_sheet_csv(root / "csv" / "en" / f"{name}.csv", name, scale.csv_rows)
+        write_sheet_csv(
+            root / "csv" / "ko" / f"{name}.csv", name, scale.csv_rows, lang="ko"
+        )
+    write_act_log(
+        root / "log" / "Network_00000_20260101.log", scale.log_mb, scale.log_sparsity
+    )
+    write_timeline(root / "timeline", "bench", scale.timeline_lines)
+    write_compare_input(root / "compare" / "input.txt", scale.timeline_lines)
+    write_rsv_mapping(root / "rsv.json", scale.rsv_entries)
+    write_data_dir(root / "data", scale.csv_rows)
+    write_coinach_dir(root / "coinach", scale.csv_rows)
+    stamp.write_text(json.dumps(asdict(scale)))
+    return root
+
+
+class _QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format: str, *args) -> None:  # noqa: A002
+        pass
+
+
+@contextmanager
+def serve(root: Path) -> Iterator[str]:
+    # raw.githubusercontent.com 대신 쓰는 로컬 HTTP 서버
+    handler = functools.partial(_QuietHandler, directory=str(root))
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
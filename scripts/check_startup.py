@@ -0,0 +1,90 @@
+# bingkit-ffxiv CLI 시작 시간 검사
+# -X importtime으로 --help와 rsv 명령이 불러오는 모듈과 시간을 재고,
+# 무거운 모듈을 불러오거나 예산을 넘으면 실패한다.
+#
+#   python scripts/check_startup.py --budget-ms 300
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# 명령을 실행하기 전에는 불러오면 안 되는 모듈
+HEAVY = ("polars", "httpr", "fsspec", "json5", "upath", "tqdm")
+RSV_LOG = "262|2026-01-01T00:00:00.0000000+09:00|0|1|_rsv_1_0_1|Hello|0\n"
+
+
+def import_times(args: list[str]) -> tuple[set[str], int]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if proc.returncode != 0:
+        msg = f"{' '.join(args)} failed:\n{proc.stderr}"
+        raise SystemExit(msg)
+
+    # import time: self [us] | cumulative | imported package
+    modules = set()
+    total = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self, cumulative, name = line.removeprefix("import time:").split("|")
+        modules.add(name.strip().split(".")[0])
+        # 들여쓰기가 없는 것만 더해야 중복되지 않는다
+        if not name.startswith("  "):
+            total += int(cumulative)
+    return modules, total
+
+
+def check(label: str, args: list[str], budget_ms: float, repeat: int = 3) -> bool:
+    # 첫 실행은 바이트코드 컴파일 등이 섞이므로 가장 빠른 결과를 쓴다
+    modules, total = min(
+        (import_times(args) for _ in range(repeat)), key=lambda result: result[1]
+    )
+    heavy = sorted(modules.intersection(HEAVY))
+    ms = total / 1000
+    ok = not heavy and ms <= budget_ms
+    print(f"[{'ok' if ok else 'FAIL'}] {label}: {ms:.1f} ms (budget {budget_ms:g} ms)")
+    if heavy:
+        print(f"  heavy modules imported: {', '.join(heavy)}")
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="bingkit-ffxiv CLI 시작 시간 검사")
+    parser.add_argument(
+        "--budget-ms", type=float, default=300, help="명령마다 허용할 import 시간(ms)"
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="명령마다 실행할 횟수, 가장 빠른 결과를 씀",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log = Path(tmp, "Network_test.log")
+        log.write_text(RSV_LOG, encoding="utf-8")
+        save = Path(tmp, "rsv.json")
+        cli = ["-m", "bingkit.ffxiv"]
+        results = [
+            check("--help", [*cli, "--help"], args.budget_ms, args.repeat),
+            check(
+                "rsv",
+                [*cli, "rsv", str(log), "-s", str(save)],
+                args.budget_ms,
+                args.repeat,
+            ),
+        ]
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
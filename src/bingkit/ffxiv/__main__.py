@@ -1,17 +1,148 @@
-import asyncio
 from pathlib import Path
-from typing import Annotated
+from typing import TYPE_CHECKING, Annotated
 
-from typer import Argument, Option, Typer
-from upath import UPath
+from typer import Argument, BadParameter, Context, Exit, Option, Typer
 
-from bingkit.ffxiv.coinach import coinach as _coinach
-from bingkit.ffxiv.raidboss import raidboss as _raidboss
-from bingkit.ffxiv.rsv import parse_log as _parse_log
-from bingkit.ffxiv.rsv import replace as _replace
-from bingkit.ffxiv.scrap import scrap as _scrap
+from bingkit.ffxiv._base import (
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_PARSE_CONCURRENCY,
+    DEFAULT_PER_HOST,
+    DEFAULT_WRITE_CONCURRENCY,
+    INDEX_NAMES,
+    RETRY_ATTEMPTS,
+    SHEETS,
+    OutputFormat,
+)
+from bingkit.ffxiv.compare.tables import Table
+from bingkit.ffxiv.lookup.modes import Match
 
+if TYPE_CHECKING:
+    from bingkit.ffxiv._base import CsvCache, Source
+
+# polars 등 무거운 모듈은 명령을 실행할 때 불러와서 --help와 rsv 명령을 빠르게 한다
 app = Typer(no_args_is_help=True)
+store_app = Typer(
+    no_args_is_help=True, help="여러 버전과 언어의 RSV 정보를 한 파일로 관리"
+)
+app.add_typer(store_app, name="rsv-store")
+
+MaxConcurrency = Annotated[
+    int,
+    Option("--max-concurrency", min=1, help="동시에 진행할 최대 다운로드 수"),
+]
+PerHost = Annotated[
+    int,
+    Option("--per-host", min=1, help="호스트 하나당 동시에 진행할 최대 다운로드 수"),
+]
+
+CacheDir = Annotated[
+    Path | None,
+    Option("--cache-dir", help="CSV 캐시 폴더, 기본값: ~/.cache/bingkit-ffxiv"),
+]
+NoCache = Annotated[bool, Option("--no-cache", help="CSV 캐시를 사용하지 않음")]
+Offline = Annotated[bool, Option("--offline", help="네트워크 없이 캐시된 CSV만 사용")]
+CacheMaxMb = Annotated[
+    int,
+    Option(
+        "--cache-max-mb", min=1, help="캐시 최대 크기(MB), 초과시 오래된 것부터 삭제"
+    ),
+]
+CacheMaxAge = Annotated[
+    float | None,
+    Option("--cache-max-age", min=0, help="이 시간(일)보다 오래된 캐시는 삭제"),
+]
+
+Formats = Annotated[
+    list[OutputFormat] | None,
+    Option(
+        "-f",
+        "--format",
+        help="저장할 파일 형식, 여러 번 지정 가능, 기본값: xlsx",
+        case_sensitive=False,
+    ),
+]
+
+Resume = Annotated[
+    bool,
+    Option(
+        "--resume", help="지난 실행의 manifest를 읽어 실패했거나 빠진 항목만 다시 받음"
+    ),
+]
+Retries = Annotated[
+    int, Option("--retries", min=1, help="항목마다 시도할 최대 다운로드 횟수")
+]
+Sources = Annotated[
+    list[str] | None,
+    Option(
+        "--source",
+        metavar="LANG=PATH_OR_URL",
+        help="언어별로 시트를 읽을 곳, 로컬 폴더나 fsspec URL, 여러 번 지정 가능, 예: en=./datamining/csv/en",
+    ),
+]
+
+
+def make_cache(
+    cache_dir: Path | None,
+    no_cache: bool,
+    offline: bool,
+    max_mb: int,
+    max_age: float | None,
+) -> "CsvCache | None":
+    from bingkit.ffxiv._base import CsvCache
+
+    if no_cache:
+        if offline:
+            msg = "--offline cannot be used with --no-cache"
+            raise BadParameter(msg)
+        return None
+    max_age = None if max_age is None else max_age * 86400
+    return CsvCache(cache_dir, max_mb * 1024**2, max_age, offline)
+
+
+def make_sources(items: list[str] | None) -> "dict[str, Source]":
+    from bingkit.ffxiv._base import parse_source_options
+
+    try:
+        return parse_source_options(items or [])
+    except ValueError as e:
+        raise BadParameter(str(e), param_hint="--source") from e
+
+
+def exit_on_failure(failed: dict[str, str | None]) -> None:
+    if failed:
+        raise Exit(1)
+
+
+@app.callback()
+def main(
+    ctx: Context,
+    profile: Annotated[
+        bool, Option("--profile", help="단계별 소요 시간을 재서 끝날 때 출력")
+    ] = False,
+    metrics: Annotated[
+        Path | None,
+        Option(
+            "--metrics",
+            help="단계별 측정 결과를 저장할 json 파일, 이름이 .trace.json으로 끝나면 Chrome trace 형식",
+        ),
+    ] = None,
+):
+    if not profile and metrics is None:
+        return
+    from loguru import logger
+
+    from bingkit.ffxiv.metrics import profile as _profile
+
+    recorder = ctx.with_resource(_profile())
+
+    # 명령이 끝나면(실패해도) 요약을 출력하고 기록을 저장한다
+    def finish() -> None:
+        if profile:
+            logger.info(f"profile:\n{recorder.report()}")
+        if metrics is not None:
+            logger.info(f"metrics saved at {recorder.save(metrics)}")
+
+    ctx.call_on_close(finish)
 
 
 @app.command(no_args_is_help=True)
@@ -20,8 +151,56 @@ def rsv(
     save_path: Annotated[
         str | None, Option("-s", "--save-path", help="결과를 저장할 파일 이름")
     ] = None,
+    workers: Annotated[
+        int | None,
+        Option("-w", "--workers", min=1, help="로그를 나눠 읽을 프로세스 수"),
+    ] = None,
+    incremental: Annotated[
+        bool,
+        Option(
+            "-i",
+            "--incremental",
+            help="지난번에 읽은 위치 이후에 추가된 로그만 읽어서 결과에 합침",
+        ),
+    ] = False,
+    follow: Annotated[
+        bool,
+        Option("-f", "--follow", help="로그를 계속 지켜보면서 결과를 갱신"),
+    ] = False,
+    interval: Annotated[
+        float, Option("--interval", min=0.1, help="--follow 갱신 간격(초)")
+    ] = 5.0,
+    store: Annotated[
+        Path | None,
+        Option(
+            "--store",
+            help="결과를 이 RSV 저장소에도 합침, 예: rsv/store.arrow",
+        ),
+    ] = None,
+    version: Annotated[
+        str | None,
+        Option(
+            "-v",
+            "--version",
+            help="저장소에 넣을 버전 이름, 기본값: 저장 파일 이름에서 추측 (rsv7_2 -> 7.2)",
+        ),
+    ] = None,
+    lang: Annotated[
+        str | None,
+        Option(
+            "-l",
+            "--lang",
+            help="저장소에 넣을 언어, 기본값: 파일 이름에서 추측, 없으면 en",
+        ),
+    ] = None,
 ):
-    _parse_log(files, save_path)
+    from bingkit.ffxiv.rsv import follow as _follow
+    from bingkit.ffxiv.rsv import parse_log as _parse_log
+
+    if follow:
+        _follow(files, save_path, interval, workers, store, version, lang)
+    else:
+        _parse_log(files, save_path, workers, incremental, store, version, lang)
 
 
 @app.command()
@@ -33,8 +212,65 @@ def scrap(
     save_dir: Annotated[
         str | None, Option("-d", "--save-dir", help="파일들을 저장할 폴더")
     ] = None,
+    max_concurrency: MaxConcurrency = DEFAULT_MAX_CONCURRENCY,
+    per_host: PerHost = DEFAULT_PER_HOST,
+    cache_dir: CacheDir = None,
+    no_cache: NoCache = False,
+    offline: Offline = False,
+    cache_max_mb: CacheMaxMb = 2048,
+    cache_max_age: CacheMaxAge = None,
+    formats: Formats = None,
+    rsv: Annotated[
+        list[str] | None,
+        Option(
+            "--rsv",
+            help="저장하기 전에 적용할 RSV json 파일이나 RSV 저장소(.arrow), 여러 번 지정하거나 glob 사용 가능",
+        ),
+    ] = None,
+    parse_concurrency: Annotated[
+        int, Option("--parse-concurrency", min=1, help="동시에 진행할 최대 파싱 수")
+    ] = DEFAULT_PARSE_CONCURRENCY,
+    write_concurrency: Annotated[
+        int, Option("--write-concurrency", min=1, help="동시에 진행할 최대 저장 수")
+    ] = DEFAULT_WRITE_CONCURRENCY,
+    memory_budget_mb: Annotated[
+        int | None,
+        Option(
+            "--memory-budget-mb",
+            min=1,
+            help="동시에 처리할 시트들의 메모리 예산(MB), 넘으면 앞의 시트가 끝날 때까지 기다림",
+        ),
+    ] = None,
+    resume: Resume = False,
+    retries: Retries = RETRY_ATTEMPTS,
+    source: Sources = None,
 ):
-    asyncio.run(_scrap(config_path, save_dir))
+    import asyncio
+
+    from bingkit.ffxiv.scrap import scrap as _scrap
+
+    sources = make_sources(source)
+    cache = make_cache(cache_dir, no_cache, offline, cache_max_mb, cache_max_age)
+    formats = formats or [OutputFormat.xlsx]
+    memory_budget = None if memory_budget_mb is None else memory_budget_mb * 1024**2
+    failed = asyncio.run(
+        _scrap(
+            config_path,
+            save_dir,
+            max_concurrency,
+            per_host,
+            cache,
+            formats,
+            rsv,
+            parse_concurrency,
+            write_concurrency,
+            memory_budget,
+            resume,
+            retries,
+            sources,
+        )
+    )
+    exit_on_failure(failed)
 
 
 @app.command()
@@ -43,35 +279,137 @@ def replace(
         str | None, Option("-d", "--data-dir", help="데이터 파일을 담은 폴더 경로")
     ] = None,
     rsv_path: Annotated[
-        str | None, Option("-r", "--rsv-path", help="RSV 정보를 담은 json 파일")
+        str | None,
+        Option(
+            "-r",
+            "--rsv-path",
+            help="RSV 정보를 담은 json 파일, RSV 저장소를 쓰려면 rsv/store.arrow, 기본값: rsv.json",
+        ),
+    ] = None,
+    workers: Annotated[
+        int | None,
+        Option("-w", "--workers", min=1, help="파일을 처리할 프로세스 수"),
     ] = None,
 ):
-    asyncio.run(_replace(data_dir, rsv_path))
+    import asyncio
 
+    from bingkit.ffxiv.rsv import replace as _replace
 
-@app.command()
+    asyncio.run(_replace(data_dir, rsv_path, workers))
+
+
+@app.command(no_args_is_help=True)
 def coinach(
-    name: Annotated[str, Argument(help="가져올 EXD 이름")],
+    names: Annotated[
+        list[str] | None, Argument(help="가져올 EXD 이름, 여러 개 지정 가능")
+    ] = None,
+    all_sheets: Annotated[
+        bool, Option("--all", help=f"모든 시트를 가져옴: {', '.join(SHEETS)}")
+    ] = False,
     output: Annotated[
         Path, Option("-o", "--output", help="결과를 저장할 폴더 경로")
     ] = Path("coinach"),
+    save_csv: Annotated[
+        bool, Option("--csv", help="언어별 CSV 파일도 함께 저장")
+    ] = False,
+    index: Annotated[
+        bool,
+        Option(
+            "--index",
+            help=f"raidboss용 번역 인덱스를 생성, 이름이 없으면 {', '.join(INDEX_NAMES)}",
+        ),
+    ] = False,
+    max_concurrency: MaxConcurrency = DEFAULT_MAX_CONCURRENCY,
+    per_host: PerHost = DEFAULT_PER_HOST,
+    cache_dir: CacheDir = None,
+    no_cache: NoCache = False,
+    offline: Offline = False,
+    cache_max_mb: CacheMaxMb = 2048,
+    cache_max_age: CacheMaxAge = None,
+    formats: Formats = None,
+    resume: Resume = False,
+    retries: Retries = RETRY_ATTEMPTS,
+    source: Sources = None,
 ):
-    _coinach(output, name)
+    names = list(SHEETS) if all_sheets else names or []
+    if not names and not index:
+        msg = "NAME is required unless --all or --index is given"
+        raise BadParameter(msg)
+    unknown = [name for name in names if name not in SHEETS]
+    if unknown:
+        msg = f"unknown sheet: {', '.join(unknown)}, choose from {', '.join(SHEETS)}"
+        raise BadParameter(msg)
+    from bingkit.ffxiv.coinach import coinach as _coinach
+    from bingkit.ffxiv.coinach import compile_index
 
+    if names:
+        sources = make_sources(source)
+        cache = make_cache(cache_dir, no_cache, offline, cache_max_mb, cache_max_age)
+        formats = formats or [OutputFormat.xlsx]
+        failed = _coinach(
+            output,
+            names,
+            max_concurrency,
+            per_host,
+            cache,
+            formats,
+            save_csv,
+            resume,
+            retries,
+            sources,
+        )
+        exit_on_failure(failed)
+    if index:
+        index_names = INDEX_NAMES if all_sheets or not names else names
+        for index_name in index_names:
+            compile_index(output, index_name)
 
-@app.command()
+
+@app.command(no_args_is_help=True)
 def raidboss(
-    url: Annotated[str, Argument(help="파싱할 Cactbot raw content URL")],
+    urls: Annotated[
+        list[str],
+        Argument(help="파싱할 Cactbot raw content URL, 여러 개나 glob, 폴더도 가능"),
+    ],
+    coinach_dir: Annotated[
+        Path,
+        Option("-c", "--coinach-dir", help="coinach 명령으로 만든 데이터 폴더"),
+    ] = Path("coinach"),
     output: Annotated[
         str | None,
         Option(
             "-o",
             "--output",
-            help="결과를 저장할 파일 이름, - 일 경우 표준 출력, None일 경우 현재 경로에 입력 파일 이름으로 저장",
+            help="결과를 저장할 파일 이름, - 일 경우 표준 출력, None일 경우 현재 경로에 입력 파일 이름으로 저장, 여러 파일일 경우 저장할 폴더",
+        ),
+    ] = None,
+    concurrency: Annotated[
+        int, Option("--concurrency", min=1, help="동시에 가져올 타임라인 수")
+    ] = 8,
+    workers: Annotated[
+        int | None,
+        Option(
+            "-w", "--workers", min=0, help="파싱 프로세스 수, 0이면 프로세스 풀 미사용"
         ),
     ] = None,
 ):
-    result = _raidboss(url)
+    import asyncio
+
+    from upath import UPath
+
+    from bingkit.ffxiv.raidboss.batch import batch as _batch
+    from bingkit.ffxiv.raidboss.batch import is_batch_input
+    from bingkit.ffxiv.raidboss.raidboss import raidboss as _raidboss
+
+    if len(urls) > 1 or is_batch_input(urls[0]):
+        if output == "-":
+            msg = "-o - cannot be used with multiple timelines"
+            raise BadParameter(msg)
+        asyncio.run(_batch(urls, output, coinach_dir, concurrency, workers))
+        return
+
+    url = urls[0]
+    result = _raidboss(url, coinach_dir)
     if output == "-":
         print(result)
     elif not output:
@@ -81,5 +419,214 @@ def raidboss(
         UPath(output).write_text(result, encoding="utf-8")
 
 
+@app.command()
+def compare(
+    input_file: Annotated[
+        str, Option("-i", "--input", help="번역할 타임라인 파일, - 일 경우 표준 입력")
+    ] = "input.txt",
+    output_file: Annotated[
+        str, Option("-o", "--output", help="결과를 저장할 파일, - 일 경우 표준 출력")
+    ] = "output.txt",
+    data_dir: Annotated[
+        Path, Option("-d", "--data-dir", help="scrap 명령으로 만든 데이터 폴더")
+    ] = Path("data"),
+    tables: Annotated[
+        list[Table] | None,
+        Option(
+            "-t",
+            "--table",
+            help="사용할 테이블, 여러 번 지정 가능, 기본값: 전부",
+            case_sensitive=False,
+        ),
+    ] = None,
+):
+    from bingkit.ffxiv.compare import compare as _compare
+
+    _compare(input_file, output_file, data_dir, tables)
+
+
+@app.command(no_args_is_help=True)
+def diff(
+    old: Annotated[Path, Argument(help="이전 스냅샷, 데이터 파일이나 RSV json 파일")],
+    new: Annotated[Path, Argument(help="새 스냅샷, 데이터 파일이나 RSV json 파일")],
+    output: Annotated[
+        str,
+        Option(
+            "-o",
+            "--output",
+            help="변경 내역을 저장할 파일, .jsonl이나 데이터 파일 확장자, RSV는 .json도 가능, - 일 경우 표준 출력",
+        ),
+    ] = "-",
+    key: Annotated[
+        str | None,
+        Option("-k", "--key", help="행을 비교할 열 이름, 기본값: # 또는 RSV 키"),
+    ] = None,
+):
+    from bingkit.ffxiv.diff import diff as _diff
+
+    _diff(old, new, output, key)
+
+
+@app.command(no_args_is_help=True)
+def lookup(
+    terms: Annotated[
+        list[str] | None, Argument(help="찾을 단어, 여러 개 지정 가능")
+    ] = None,
+    data_dir: Annotated[
+        Path, Option("-d", "--data-dir", help="coinach 명령으로 만든 데이터 폴더")
+    ] = Path("coinach"),
+    source: Annotated[str, Option("--from", help="찾을 단어의 언어")] = "en",
+    targets: Annotated[
+        list[str] | None,
+        Option("--to", help="보여줄 언어, 여러 번 지정 가능, 기본값: 모든 언어"),
+    ] = None,
+    match: Annotated[
+        Match,
+        Option(
+            "-m",
+            "--match",
+            help="exact: 그대로, ignore_case: 대소문자 무시, prefix: 대소문자 무시하고 앞부분만",
+            case_sensitive=False,
+        ),
+    ] = Match.exact,
+    sheets: Annotated[
+        list[str] | None,
+        Option("--sheet", help="찾을 시트, 여러 번 지정 가능, 기본값: 전부"),
+    ] = None,
+    limit: Annotated[
+        int, Option("-n", "--limit", min=1, help="단어마다 보여줄 최대 결과 수")
+    ] = 20,
+    as_json: Annotated[bool, Option("--json", help="결과를 json으로 출력")] = False,
+    serve: Annotated[
+        bool,
+        Option(
+            "--serve",
+            help="데이터를 한 번만 읽고 HTTP 서버로 계속 응답, GET /lookup?q=..., POST /lookup",
+        ),
+    ] = False,
+    host: Annotated[str, Option("--host", help="서버 주소")] = "127.0.0.1",
+    port: Annotated[int, Option("--port", min=0, help="서버 포트")] = 8731,
+    socket_path: Annotated[
+        Path | None,
+        Option("--socket", help="포트 대신 사용할 유닉스 소켓 경로"),
+    ] = None,
+):
+    if not terms and not serve:
+        msg = "TERMS is required unless --serve is given"
+        raise BadParameter(msg)
+    from bingkit.ffxiv.lookup import load_store
+    from bingkit.ffxiv.lookup import serve as _serve
+
+    term_store = load_store(data_dir)
+    if serve:
+        _serve(term_store, host, port, socket_path)
+        return
+    options = {
+        "source": source,
+        "targets": targets,
+        "match": match,
+        "sheets": sheets,
+        "limit": limit,
+    }
+    try:
+        if as_json:
+            import json
+
+            results = term_store.lookup_many(terms, **options)
+            print(json.dumps(results, ensure_ascii=False, indent=2))
+            return
+        df = term_store.search(terms, **options)
+    except ValueError as e:
+        raise BadParameter(str(e)) from e
+    for query, sheet, field, row, *texts in df.iter_rows():
+        texts = ["" if text is None else text for text in texts]
+        print("\t".join([query, f"{sheet}.{field}#{row}", *texts]))
+
+
+StorePath = Annotated[
+    Path | None,
+    Option("-s", "--store", help="RSV 저장소 파일 경로, 기본값: rsv/store.arrow"),
+]
+StoreLang = Annotated[str, Option("-l", "--lang", help="RSV 정보의 언어")]
+
+
+@store_app.command("import", no_args_is_help=True)
+def store_import(
+    files: Annotated[list[Path], Argument(help="가져올 RSV json 또는 txt 파일")],
+    store: StorePath = None,
+    version: Annotated[
+        str | None,
+        Option(
+            "-v",
+            "--version",
+            help="버전 이름, 기본값: 파일 이름에서 추측 (rsv7_2 -> 7.2)",
+        ),
+    ] = None,
+    lang: Annotated[
+        str | None,
+        Option("-l", "--lang", help="언어, 기본값: 파일 이름에서 추측, 없으면 en"),
+    ] = None,
+):
+    from bingkit.ffxiv.rsv.store import RsvStore
+
+    rsv_store = RsvStore(store)
+    for file in files:
+        rsv_store.import_file(file, version, lang)
+    rsv_store.save()
+
+
+@store_app.command("export", no_args_is_help=True)
+def store_export(
+    output: Annotated[Path, Argument(help="저장할 json 또는 txt 파일")],
+    store: StorePath = None,
+    version: Annotated[
+        str | None,
+        Option("-v", "--version", help="내보낼 버전, 기본값: 키마다 가장 최신 버전"),
+    ] = None,
+    lang: StoreLang = "en",
+):
+    from bingkit.ffxiv.rsv.store import RsvStore
+
+    count = RsvStore(store).export(output, version, lang)
+    print(f"{count} entries saved at {output}")
+
+
+@store_app.command("merge", no_args_is_help=True)
+def store_merge(
+    others: Annotated[list[Path], Argument(help="합칠 다른 RSV 저장소 파일")],
+    store: StorePath = None,
+):
+    from bingkit.ffxiv.rsv.store import RsvStore
+
+    rsv_store = RsvStore(store)
+    for other in others:
+        inserted, updated = rsv_store.merge(RsvStore(other))
+        print(f"{other}: {inserted} new, {updated} updated")
+    rsv_store.save()
+
+
+@store_app.command("get", no_args_is_help=True)
+def store_get(
+    keys: Annotated[list[str], Argument(help="찾을 RSV 키")],
+    store: StorePath = None,
+):
+    from bingkit.ffxiv.rsv.store import RsvStore
+
+    rsv_store = RsvStore(store)
+    for key in keys:
+        for row in rsv_store.get(key).iter_rows(named=True):
+            print(f"{row['key']}\t{row['version']}\t{row['lang']}\t{row['value']}")
+
+
+@store_app.command("info")
+def store_info(store: StorePath = None):
+    from bingkit.ffxiv.rsv.store import RsvStore
+
+    rsv_store = RsvStore(store)
+    print(f"{len(rsv_store)} entries")
+    print(f"versions: {', '.join(rsv_store.versions())}")
+    print(f"langs: {', '.join(rsv_store.langs())}")
+
+
 if __name__ == "__main__":
     app()
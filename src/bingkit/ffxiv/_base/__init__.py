@@ -0,0 +1,196 @@
+from typing import TYPE_CHECKING
+
+from bingkit.ffxiv._lazy import lazy_exports
+
+from .defaults import (
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_PARSE_CONCURRENCY,
+    DEFAULT_PER_HOST,
+    DEFAULT_WRITE_CONCURRENCY,
+    INDEX_NAMES,
+    RETRY_ATTEMPTS,
+    RETRY_BACKOFF,
+)
+from .formats import SUFFIXES, OutputFormat
+
+if TYPE_CHECKING:
+    from .budget import MemoryBudget, Reservation
+    from .cache import DEFAULT_MAX_BYTES, CacheEntry, CsvCache, default_cache_dir
+    from .download import Downloader, current_downloader, download_session
+    from .frame import (
+        find_frame,
+        frame_candidates,
+        join_languages,
+        read_file,
+        read_frame,
+        write_frame,
+    )
+    from .manifest import Manifest, ManifestItem
+    from .metrics import (
+        Metrics,
+        Span,
+        current_metrics,
+        profile,
+        run_in_executor,
+        span,
+        tags,
+    )
+    from .schema import SchemaRegistry, read_header, to_dtype
+    from .sheet import (
+        SCHEMAS,
+        FetchError,
+        fetch_sheet,
+        get_csv,
+        get_sheet,
+        get_sheet_retry,
+        parse_csv,
+        parse_sheet,
+        parse_slot,
+    )
+    from .source import (
+        FsspecSource,
+        HttpSource,
+        LocalSource,
+        Source,
+        get_source,
+        parse_source,
+        parse_source_options,
+        use_sources,
+    )
+
+__all__ = [
+    "BASE_URL",
+    "DEFAULT_MAX_BYTES",
+    "DEFAULT_MAX_CONCURRENCY",
+    "DEFAULT_PARSE_CONCURRENCY",
+    "DEFAULT_PER_HOST",
+    "DEFAULT_WRITE_CONCURRENCY",
+    "INDEX_NAMES",
+    "LANG",
+    "RETRY_ATTEMPTS",
+    "RETRY_BACKOFF",
+    "SCHEMAS",
+    "SHEETS",
+    "SUFFIXES",
+    "CacheEntry",
+    "CsvCache",
+    "Downloader",
+    "FetchError",
+    "FsspecSource",
+    "HttpSource",
+    "LocalSource",
+    "Manifest",
+    "ManifestItem",
+    "MemoryBudget",
+    "Metrics",
+    "OutputFormat",
+    "Reservation",
+    "SchemaRegistry",
+    "Source",
+    "Span",
+    "current_downloader",
+    "current_metrics",
+    "default_cache_dir",
+    "download_session",
+    "fetch_sheet",
+    "find_frame",
+    "frame_candidates",
+    "get_csv",
+    "get_sheet",
+    "get_sheet_retry",
+    "get_source",
+    "join_languages",
+    "parse_csv",
+    "parse_sheet",
+    "parse_slot",
+    "parse_source",
+    "parse_source_options",
+    "profile",
+    "read_file",
+    "read_frame",
+    "read_header",
+    "run_in_executor",
+    "span",
+    "tags",
+    "to_dtype",
+    "use_sources",
+    "write_frame",
+]
+
+BASE_URL: dict[str, str] = {
+    "en": "https://raw.githubusercontent.com/xivapi/ffxiv-datamining/refs/heads/master/csv/en/{name}.csv",
+    "de": "https://raw.githubusercontent.com/xivapi/ffxiv-datamining/refs/heads/master/csv/de/{name}.csv",
+    "fr": "https://raw.githubusercontent.com/xivapi/ffxiv-datamining/refs/heads/master/csv/fr/{name}.csv",
+    "ja": "https://raw.githubusercontent.com/xivapi/ffxiv-datamining/refs/heads/master/csv/ja/{name}.csv",
+    "cn": "https://raw.githubusercontent.com/thewakingsands/ffxiv-datamining-cn/refs/heads/master/{name}.csv",
+    "ko": "https://raw.githubusercontent.com/Ra-Workspace/ffxiv-datamining-ko/refs/heads/master/csv/{name}.csv",
+    "tc": "https://raw.githubusercontent.com/thewakingsands/ffxiv-datamining-tc/refs/heads/main/{name}.csv",
+}
+
+LANG = tuple(BASE_URL.keys())
+
+SHEETS: dict[str, list[str]] = {
+    "Action": ["Name"],
+    "BNpcName": ["Singular"],
+    "Balloon": ["Dialogue"],
+    "Completion": ["Text", "GroupTitle"],
+    "DynamicEvent": ["Name", "Description"],
+    "Fate": ["Name", "Description"],
+    "InstanceContentTextData": ["Text"],
+    "LogMessage": ["Text"],
+    "NpcYell": ["Text"],
+    "PlaceName": ["Name"],
+    "PublicContentTextData": ["TextData"],
+    "Status": ["Name", "Description"],
+}
+
+# polars, httpr이 필요한 것들은 처음 쓸 때 불러온다
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "MemoryBudget": ".budget",
+        "Reservation": ".budget",
+        "DEFAULT_MAX_BYTES": ".cache",
+        "CacheEntry": ".cache",
+        "CsvCache": ".cache",
+        "default_cache_dir": ".cache",
+        "Downloader": ".download",
+        "current_downloader": ".download",
+        "download_session": ".download",
+        "find_frame": ".frame",
+        "frame_candidates": ".frame",
+        "join_languages": ".frame",
+        "read_file": ".frame",
+        "read_frame": ".frame",
+        "write_frame": ".frame",
+        "Manifest": ".manifest",
+        "ManifestItem": ".manifest",
+        "Metrics": ".metrics",
+        "Span": ".metrics",
+        "current_metrics": ".metrics",
+        "profile": ".metrics",
+        "run_in_executor": ".metrics",
+        "span": ".metrics",
+        "tags": ".metrics",
+        "SchemaRegistry": ".schema",
+        "read_header": ".schema",
+        "to_dtype": ".schema",
+        "SCHEMAS": ".sheet",
+        "FetchError": ".sheet",
+        "fetch_sheet": ".sheet",
+        "get_csv": ".sheet",
+        "get_sheet": ".sheet",
+        "get_sheet_retry": ".sheet",
+        "parse_csv": ".sheet",
+        "parse_sheet": ".sheet",
+        "parse_slot": ".sheet",
+        "FsspecSource": ".source",
+        "HttpSource": ".source",
+        "LocalSource": ".source",
+        "Source": ".source",
+        "get_source": ".source",
+        "parse_source": ".source",
+        "parse_source_options": ".source",
+        "use_sources": ".source",
+    },
+)
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+
+class Reservation:
+    def __init__(self, budget: MemoryBudget, nbytes: int):
+        self.budget = budget
+        self.nbytes = nbytes
+
+    async def resize(self, nbytes: int) -> None:
+        await self.budget.resize(self, nbytes)
+
+
+class MemoryBudget:
+    def __init__(self, limit: int | None = None):
+        if limit is not None and limit < 1:
+            msg = "memory budget must be at least 1 byte"
+            raise ValueError(msg)
+        self.limit = limit
+        self.used = 0
+        self._cond = asyncio.Condition()
+
+    def _fits(self, nbytes: int) -> bool:
+        # 예산보다 큰 작업도 혼자일 때는 들어올 수 있다
+        return self.limit is None or self.used == 0 or self.used + nbytes <= self.limit
+
+    @asynccontextmanager
+    async def reserve(self, nbytes: int) -> AsyncIterator[Reservation]:
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._fits(nbytes))
+            self.used += nbytes
+        reservation = Reservation(self, nbytes)
+        try:
+            yield reservation
+        finally:
+            async with self._cond:
+                self.used -= reservation.nbytes
+                self._cond.notify_all()
+
+    async def resize(self, reservation: Reservation, nbytes: int) -> None:
+        # 이미 들어온 작업이므로 늘어날 때는 기다리지 않고 기록만 한다
+        async with self._cond:
+            self.used += nbytes - reservation.nbytes
+            reservation.nbytes = nbytes
+            self._cond.notify_all()
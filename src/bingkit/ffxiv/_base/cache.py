@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import polars as pl
+from loguru import logger
+
+from .metrics import span
+from .schema import SchemaRegistry
+
+DEFAULT_MAX_BYTES = 2 * 1024**3
+
+
+def default_cache_dir() -> Path:
+    env = os.environ.get("BINGKIT_FFXIV_CACHE_DIR")
+    if env:
+        return Path(env)
+    return Path.home().joinpath(".cache", "bingkit-ffxiv")
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    sha256: str
+    size: int
+    etag: str | None
+    last_modified: str | None
+    fetched_at: float
+    accessed_at: float
+
+
+class CsvCache:
+    def __init__(
+        self,
+        root: str | os.PathLike[str] | None = None,
+        max_bytes: int | None = DEFAULT_MAX_BYTES,
+        max_age: float | None = None,
+        offline: bool = False,
+    ):
+        self.root = default_cache_dir() if root is None else Path(root)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.offline = offline
+        self._index_path = self.root.joinpath("index.json")
+        self._entries: dict[str, CacheEntry] = self._load_index()
+        self.schemas = SchemaRegistry(self.root.joinpath("schemas.json"))
+
+    @staticmethod
+    def key(lang: str, name: str) -> str:
+        return f"{lang}/{name}"
+
+    def _load_index(self) -> dict[str, CacheEntry]:
+        if not self._index_path.exists():
+            return {}
+        try:
+            raw = json.loads(self._index_path.read_bytes())
+        except json.JSONDecodeError:
+            logger.warning(f"broken cache index {self._index_path}, starting fresh")
+            return {}
+        return {key: CacheEntry(**value) for key, value in raw.items()}
+
+    def save(self) -> None:
+        self.schemas.save()
+        self.root.mkdir(parents=True, exist_ok=True)
+        data = {key: asdict(entry) for key, entry in self._entries.items()}
+        tmp = self._index_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        tmp.replace(self._index_path)
+
+    def blob_path(self, sha256: str) -> Path:
+        return self.root.joinpath("blobs", sha256[:2], f"{sha256}.csv")
+
+    def parsed_path(self, sha256: str, columns: list[str] | None) -> Path:
+        cols = "\x1f".join(columns) if columns is not None else "\x00"
+        digest = hashlib.sha256(cols.encode()).hexdigest()[:16]
+        return self.root.joinpath("parsed", sha256[:2], f"{sha256}-{digest}.arrow")
+
+    def get(self, lang: str, name: str, url: str | None = None) -> CacheEntry | None:
+        entry = self._entries.get(self.key(lang, name))
+        if entry is None or (url is not None and entry.url != url):
+            return None
+        if not self.blob_path(entry.sha256).exists():
+            return None
+        return entry
+
+    def validators(self, entry: CacheEntry | None) -> dict[str, str]:
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def put(
+        self,
+        lang: str,
+        name: str,
+        url: str,
+        content: bytes,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> CacheEntry:
+        sha256 = hashlib.sha256(content).hexdigest()
+        path = self.blob_path(sha256)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(content)
+            tmp.replace(path)
+        now = time.time()
+        entry = CacheEntry(
+            url=url,
+            sha256=sha256,
+            size=len(content),
+            etag=etag,
+            last_modified=last_modified,
+            fetched_at=now,
+            accessed_at=now,
+        )
+        self._entries[self.key(lang, name)] = entry
+        return entry
+
+    def touch(self, entry: CacheEntry, revalidated: bool = False) -> None:
+        now = time.time()
+        entry.accessed_at = now
+        if revalidated:
+            entry.fetched_at = now
+
+    def read_parsed(
+        self, entry: CacheEntry, columns: list[str] | None
+    ) -> pl.DataFrame | None:
+        path = self.parsed_path(entry.sha256, columns)
+        if not path.exists():
+            return None
+        with span("read", path=str(path), bytes=path.stat().st_size) as attrs:
+            df = pl.read_ipc(path)
+            attrs["rows"] = df.height
+        return df
+
+    def write_parsed(
+        self, entry: CacheEntry, columns: list[str] | None, df: pl.DataFrame
+    ) -> None:
+        path = self.parsed_path(entry.sha256, columns)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        df.write_ipc(tmp)
+        tmp.replace(path)
+
+    def _parsed_sizes(self) -> dict[str, int]:
+        sizes: dict[str, int] = {}
+        for path in self.root.joinpath("parsed").glob("*/*.arrow"):
+            sha256 = path.name.split("-")[0]
+            sizes[sha256] = sizes.get(sha256, 0) + path.stat().st_size
+        return sizes
+
+    def evict(self) -> None:
+        now = time.time()
+        entries = sorted(self._entries.items(), key=lambda item: item[1].accessed_at)
+        if self.max_age is not None:
+            expired = [k for k, e in entries if now - e.fetched_at > self.max_age]
+            for key in expired:
+                del self._entries[key]
+            entries = [(k, e) for k, e in entries if k not in expired]
+
+        if self.max_bytes is not None:
+            # 파싱한 arrow 파일도 용량에 넣는다, 같은 내용을 가진 항목은 파일을 같이 쓴다
+            sizes = self._parsed_sizes()
+            blobs = {entry.sha256: entry.size for _, entry in entries}
+            for sha256, size in blobs.items():
+                sizes[sha256] = sizes.get(sha256, 0) + size
+            refs = Counter(entry.sha256 for _, entry in entries)
+            total = sum(sizes[sha256] for sha256 in refs)
+            while entries and total > self.max_bytes:
+                key, entry = entries.pop(0)
+                refs[entry.sha256] -= 1
+                if not refs[entry.sha256]:
+                    total -= sizes[entry.sha256]
+                del self._entries[key]
+
+        alive = {entry.sha256 for entry in self._entries.values()}
+        for folder in ("blobs", "parsed"):
+            for path in self.root.joinpath(folder).glob("*/*"):
+                if path.name.split(".")[0].split("-")[0] not in alive:
+                    path.unlink(missing_ok=True)
@@ -0,0 +1,11 @@
+import os
+
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_PER_HOST = 4
+DEFAULT_PARSE_CONCURRENCY = os.cpu_count() or 4
+DEFAULT_WRITE_CONCURRENCY = 2
+
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF = 1.0
+
+INDEX_NAMES = ("Action", "BNpcName")
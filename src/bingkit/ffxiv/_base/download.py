@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+import httpr
+from loguru import logger
+
+from .cache import CsvCache
+from .defaults import (
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_PARSE_CONCURRENCY,
+    DEFAULT_PER_HOST,
+)
+from .metrics import span
+
+
+@dataclass
+class DownloadStats:
+    requests: int = 0
+    nbytes: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def add(self, nbytes: int) -> None:
+        self.requests += 1
+        self.nbytes += nbytes
+
+    def report(self) -> str:
+        elapsed = max(self.elapsed, 1e-9)
+        mb = self.nbytes / 1_000_000
+        return (
+            f"{self.requests} requests, {mb:.2f} MB in {elapsed:.2f}s "
+            f"({self.requests / elapsed:.2f} req/s, {mb / elapsed:.2f} MB/s)"
+        )
+
+
+class Downloader:
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        per_host: int = DEFAULT_PER_HOST,
+        timeout: float | None = 60,
+        cache: CsvCache | None = None,
+        parse_concurrency: int = DEFAULT_PARSE_CONCURRENCY,
+    ):
+        if max_concurrency < 1 or per_host < 1 or parse_concurrency < 1:
+            msg = "max_concurrency, per_host and parse_concurrency must be at least 1"
+            raise ValueError(msg)
+        self.max_concurrency = max_concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.cache = cache
+        self.stats = DownloadStats()
+        self._client: httpr.AsyncClient | None = None
+        self._limit = asyncio.Semaphore(max_concurrency)
+        self._host_limits: dict[str, asyncio.Semaphore] = {}
+        # CSV 파싱은 다운로드와 따로 제한한다
+        self.parse_limit = asyncio.Semaphore(parse_concurrency)
+
+    async def __aenter__(self) -> Downloader:
+        self._client = httpr.AsyncClient(
+            timeout=self.timeout, max_concurrency=self.max_concurrency
+        )
+        self.stats = DownloadStats()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self.cache is not None:
+            self.cache.evict()
+            self.cache.save()
+        if self.stats.requests:
+            logger.info(f"download: {self.stats.report()}")
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.per_host)
+        return self._host_limits[host]
+
+    async def get(
+        self, url: str, headers: dict[str, str] | None = None
+    ) -> httpr.Response:
+        if self._client is None:
+            msg = "Downloader is not started, use it with 'async with'"
+            raise RuntimeError(msg)
+        async with self._limit, self._host_limit(url):
+            with span("fetch", url=url) as attrs:
+                resp = await self._client.get(url, headers=headers)
+                attrs.update(bytes=len(resp.content), status=resp.status_code)
+        self.stats.add(len(resp.content))
+        return resp
+
+
+_current: ContextVar[Downloader | None] = ContextVar("downloader", default=None)
+
+
+def current_downloader() -> Downloader | None:
+    return _current.get()
+
+
+@asynccontextmanager
+async def download_session(
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    per_host: int = DEFAULT_PER_HOST,
+    cache: CsvCache | None = None,
+    parse_concurrency: int = DEFAULT_PARSE_CONCURRENCY,
+) -> AsyncIterator[Downloader]:
+    async with Downloader(
+        max_concurrency, per_host, cache=cache, parse_concurrency=parse_concurrency
+    ) as downloader:
+        token = _current.set(downloader)
+        try:
+            yield downloader
+        finally:
+            _current.reset(token)
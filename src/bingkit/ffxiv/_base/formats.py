@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import os
+from enum import StrEnum
+from pathlib import Path
+
+
+class OutputFormat(StrEnum):
+    xlsx = "xlsx"
+    parquet = "parquet"
+    ipc = "ipc"
+
+    @property
+    def suffix(self) -> str:
+        return ".arrow" if self is OutputFormat.ipc else f".{self.value}"
+
+    @classmethod
+    def from_path(cls, path: str | os.PathLike[str]) -> OutputFormat:
+        suffix = Path(path).suffix
+        for fmt in cls:
+            if fmt.suffix == suffix:
+                return fmt
+        msg = f"unsupported file type: {str(path)!r}"
+        raise ValueError(msg)
+
+
+# 빠르게 읽을 수 있는 순서: ipc는 메모리 맵으로 바로 읽힌다
+READ_ORDER = (OutputFormat.ipc, OutputFormat.parquet, OutputFormat.xlsx)
+SUFFIXES = tuple(fmt.suffix for fmt in READ_ORDER)
+
+
+def strip_suffix(path: str | os.PathLike[str]) -> Path:
+    path = Path(path)
+    return path.with_suffix("") if path.suffix in SUFFIXES else path
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import os
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+
+import polars as pl
+
+from .formats import READ_ORDER, SUFFIXES, OutputFormat, strip_suffix
+from .metrics import span
+
+
+def write_frame(
+    df: pl.DataFrame,
+    path: str | os.PathLike[str],
+    formats: Iterable[OutputFormat | str] = (OutputFormat.xlsx,),
+) -> list[Path]:
+    base = strip_suffix(path)
+    saved = []
+    for fmt in dict.fromkeys(OutputFormat(f) for f in formats):
+        save_path = base.with_name(base.name + fmt.suffix)
+        # 쓰는 도중에 실패해도 원래 파일이 남도록 임시 파일에 쓰고 교체한다
+        # Windows에서는 메모리 맵으로 열린 파일을 교체할 수 없으므로 read_file(memory_map=False)로 읽는다
+        tmp = save_path.with_name(f".{save_path.name}.tmp")
+        with span("write", path=str(save_path), rows=df.height) as attrs:
+            if fmt is OutputFormat.xlsx:
+                df.write_excel(tmp)
+            elif fmt is OutputFormat.parquet:
+                df.write_parquet(tmp)
+            else:
+                df.write_ipc(tmp)
+            attrs["bytes"] = tmp.stat().st_size
+            tmp.replace(save_path)
+        saved.append(save_path)
+    return saved
+
+
+def _key_dtype(frames: Iterable[pl.LazyFrame], key: str) -> pl.DataType:
+    dtypes = [lf.collect_schema()[key] for lf in frames]
+    return pl.Int64 if all(dtype.is_integer() for dtype in dtypes) else pl.String
+
+
+def join_languages(
+    frames: Mapping[str, pl.DataFrame | pl.LazyFrame], key: str = "#"
+) -> pl.DataFrame:
+    # 언어마다 행 수나 순서가 다를 수 있으므로 위치가 아니라 key로 합친다
+    # 한쪽에만 있는 행은 나머지 언어가 null이 된다
+    lazy = {lang: df.lazy() for lang, df in frames.items()}
+    if not lazy:
+        msg = "no frames to join"
+        raise ValueError(msg)
+    dtype = _key_dtype(lazy.values(), key)
+    parts = []
+    for lang, lf in lazy.items():
+        columns = [col for col in lf.collect_schema().names() if col != key]
+        parts.append(
+            lf.select(
+                pl.col(key).cast(dtype),
+                *(pl.col(col).alias(f"{col}_{lang}") for col in columns),
+            )
+        )
+    # 모든 언어의 key를 먼저 모으고 언어를 하나씩 left join해서 붙인다
+    # 한 번에 한 언어만 join하므로 결과 밖의 메모리가 언어 수에 따라 늘지 않는다
+    keys = (
+        pl.concat([lf.select(key) for lf in parts])
+        .unique(maintain_order=True)
+        .collect(engine="streaming")
+    )
+    columns = [keys]
+    for lf in parts:
+        aligned = keys.lazy().join(lf, on=key, how="left", maintain_order="left")
+        columns.append(aligned.drop(key).collect(engine="streaming"))
+    return pl.concat(columns, how="horizontal")
+
+
+def frame_candidates(path: str | os.PathLike[str]) -> list[Path]:
+    base = strip_suffix(path)
+    candidates = (base.with_name(base.name + fmt.suffix) for fmt in READ_ORDER)
+    return [candidate for candidate in candidates if candidate.exists()]
+
+
+def find_frame(path: str | os.PathLike[str]) -> Path | None:
+    # 예전 실행에서 다른 형식으로 저장한 파일이 남아 있을 수 있으므로 가장 최근 파일을 고른다
+    # 수정 시간이 같으면 READ_ORDER에서 앞에 있는 형식
+    candidates = frame_candidates(path)
+    if not candidates:
+        return None
+    return max(candidates, key=lambda candidate: candidate.stat().st_mtime_ns)
+
+
+def _read_file(path: str | os.PathLike[str], memory_map: bool) -> pl.DataFrame:
+    fmt = OutputFormat.from_path(path)
+    if fmt is OutputFormat.ipc:
+        # 압축하지 않은 arrow 파일은 메모리 맵으로 읽히므로 덮어쓸 파일은 바이트로 읽는다
+        return pl.read_ipc(path if memory_map else Path(path).read_bytes())
+    if fmt is OutputFormat.parquet:
+        return pl.read_parquet(path)
+    return pl.read_excel(path)
+
+
+def read_file(path: str | os.PathLike[str], memory_map: bool = True) -> pl.DataFrame:
+    with span("read", path=str(path), bytes=Path(path).stat().st_size) as attrs:
+        df = _read_file(path, memory_map)
+        attrs["rows"] = df.height
+    return df
+
+
+def read_frame(path: str | os.PathLike[str]) -> pl.DataFrame:
+    found = find_frame(path)
+    if found is None:
+        msg = f"{str(path)!r} does not exist in any of {SUFFIXES}"
+        raise FileNotFoundError(msg)
+    return read_file(found)
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import polars as pl
+from loguru import logger
+
+MANIFEST_NAME = ".manifest.json"
+PARTS_DIR = ".parts"
+
+
+@dataclass
+class ManifestItem:
+    status: str
+    sha256: str | None = None
+    columns: list[str] | None = None
+    outputs: list[str] = field(default_factory=list)
+    # 시트 항목에 남기는 언어별 데이터의 sha256
+    parts: dict[str, str | None] = field(default_factory=dict)
+    error: str | None = None
+    updated_at: float = field(default_factory=time.time)
+
+
+def file_digest(path: Path) -> str:
+    with path.open("rb") as file:
+        return hashlib.file_digest(file, "sha256").hexdigest()
+
+
+class Manifest:
+    def __init__(self, root: str | os.PathLike[str], resume: bool = False):
+        self.root = Path(root)
+        self.path = self.root.joinpath(MANIFEST_NAME)
+        self.parts = self.root.joinpath(PARTS_DIR)
+        self.items: dict[str, ManifestItem] = {}
+        if resume and self.path.exists():
+            try:
+                raw = json.loads(self.path.read_bytes())
+            except json.JSONDecodeError:
+                logger.warning(f"broken manifest {self.path}, starting fresh")
+            else:
+                self.items = {k: ManifestItem(**v) for k, v in raw.items()}
+
+    @staticmethod
+    def key(name: str, lang: str | None = None) -> str:
+        return name if lang is None else f"{name}/{lang}"
+
+    def save(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        data = {key: asdict(item) for key, item in self.items.items()}
+        tmp = self.path.with_name(f".{self.path.name}.tmp")
+        tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        tmp.replace(self.path)
+
+    def part_path(self, name: str, lang: str) -> Path:
+        return self.parts.joinpath(f"{name}.{lang}.arrow")
+
+    def load_part(
+        self, name: str, lang: str, columns: list[str] | None
+    ) -> pl.DataFrame | None:
+        item = self.items.get(self.key(name, lang))
+        path = self.part_path(name, lang)
+        if item is None or item.status != "done" or item.columns != columns:
+            return None
+        if not path.exists() or file_digest(path) != item.sha256:
+            return None
+        # 나중에 지울 파일이므로 메모리 맵 대신 바이트로 읽는다
+        return pl.read_ipc(path.read_bytes())
+
+    def scan_part(self, name: str, lang: str) -> pl.LazyFrame:
+        # 합칠 때 전부 메모리에 올리지 않고 파일에서 읽는다
+        return pl.scan_ipc(self.part_path(name, lang))
+
+    def part_size(self, name: str, lang: str) -> int:
+        path = self.part_path(name, lang)
+        return path.stat().st_size if path.exists() else 0
+
+    def write_part(self, name: str, lang: str, df: pl.DataFrame) -> str:
+        path = self.part_path(name, lang)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.tmp")
+        df.write_ipc(tmp)
+        tmp.replace(path)
+        return file_digest(path)
+
+    def is_done(self, name: str) -> bool:
+        item = self.items.get(self.key(name))
+        if item is None or item.status != "done":
+            return False
+        return all(Path(path).exists() for path in item.outputs)
+
+    def done(
+        self,
+        key: str,
+        sha256: str | None = None,
+        columns: list[str] | None = None,
+        outputs: list[Path] | None = None,
+    ) -> None:
+        self.items[key] = ManifestItem(
+            "done", sha256, columns, [str(path) for path in outputs or []]
+        )
+        self.save()
+
+    def fail(self, key: str, error: BaseException | str) -> None:
+        self.items[key] = ManifestItem("failed", error=str(error))
+        self.save()
+
+    def finish(self, name: str, outputs: list[Path], langs: tuple[str, ...]) -> None:
+        # 언어별 항목은 지우지만 해시는 시트 항목에 남기고, 결과 파일의 해시도 기록한다
+        parts = {}
+        for lang in langs:
+            # 윈도우에서는 아직 메모리 맵으로 열려 있으면 지울 수 없다, 다음 실행에서 덮어쓴다
+            with contextlib.suppress(PermissionError):
+                self.part_path(name, lang).unlink(missing_ok=True)
+            item = self.items.pop(self.key(name, lang), None)
+            parts[lang] = None if item is None else item.sha256
+        sha256 = file_digest(outputs[0]) if outputs else None
+        self.items[self.key(name)] = ManifestItem(
+            "done", sha256, outputs=[str(path) for path in outputs], parts=parts
+        )
+        self.save()
+
+    def failed(self) -> dict[str, str | None]:
+        return {
+            key: item.error
+            for key, item in self.items.items()
+            if item.status == "failed"
+        }
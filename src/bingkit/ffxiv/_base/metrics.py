@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Executor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+# 요약에서 더하는 값들
+TOTALS = ("bytes", "rows")
+
+
+@dataclass
+class Span:
+    name: str
+    start: float
+    duration: float
+    attrs: dict[str, Any] = field(default_factory=dict)
+    pid: int = field(default_factory=os.getpid)
+    tid: int = field(default_factory=threading.get_native_id)
+
+
+class Metrics:
+    def __init__(self):
+        self.spans: list[Span] = []
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+
+    def __len__(self) -> int:
+        return len(self.spans)
+
+    @contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[dict[str, Any]]:
+        # 블록 안에서 attrs에 bytes, rows 등을 추가할 수 있다
+        attrs = {**_tags.get(), **attrs}
+        start = time.perf_counter()
+        try:
+            yield attrs
+        except BaseException as e:
+            attrs["error"] = type(e).__name__
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            self.spans.append(Span(name, start, duration, attrs))
+
+    def extend(self, spans: Iterable[Span]) -> None:
+        self.spans.extend(spans)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        result: dict[str, dict[str, float]] = {}
+        for span in self.spans:
+            stage = result.setdefault(span.name, {"count": 0, "seconds": 0.0})
+            stage["count"] += 1
+            stage["seconds"] += span.duration
+            for key in TOTALS:
+                value = span.attrs.get(key)
+                if isinstance(value, int):
+                    stage[key] = stage.get(key, 0) + value
+        return result
+
+    def report(self) -> str:
+        lines = [f"{'stage':<10} {'count':>7} {'seconds':>10} {'MB':>10} {'rows':>12}"]
+        for name, stage in sorted(
+            self.summary().items(), key=lambda item: -item[1]["seconds"]
+        ):
+            mb = f"{stage['bytes'] / 1_000_000:.2f}" if "bytes" in stage else "-"
+            rows = f"{stage['rows']:,}" if "rows" in stage else "-"
+            lines.append(
+                f"{name:<10} {stage['count']:>7} {stage['seconds']:>10.3f} {mb:>10} {rows:>12}"
+            )
+        return "\n".join(lines)
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        # chrome://tracing, ui.perfetto.dev에서 열 수 있는 형식, 시간 단위는 마이크로초
+        events = [
+            {
+                "name": span.name,
+                "cat": span.name,
+                "ph": "X",
+                "ts": round((span.start - self.started) * 1e6, 1),
+                "dur": round(span.duration * 1e6, 1),
+                "pid": span.pid,
+                "tid": span.tid,
+                "args": span.attrs,
+            }
+            for span in sorted(self.spans, key=lambda span: span.start)
+        ]
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"started_at": self.started_at},
+            "summary": self.summary(),
+        }
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "started_at": self.started_at,
+            "spans": [
+                {**asdict(span), "start": span.start - self.started}
+                for span in self.spans
+            ],
+            "summary": self.summary(),
+        }
+
+    def save(self, path: str | os.PathLike[str]) -> Path:
+        # 이름이 .trace.json으로 끝나면 Chrome trace, 아니면 span 목록
+        path = Path(path)
+        data = (
+            self.to_chrome_trace()
+            if path.name.endswith(".trace.json")
+            else self.to_dict()
+        )
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            json.dumps(data, ensure_ascii=False, default=str), encoding="utf-8"
+        )
+        return path
+
+
+_current: ContextVar[Metrics | None] = ContextVar("metrics", default=None)
+_tags: ContextVar[dict[str, Any]] = ContextVar("metrics_tags", default={})  # noqa: B039
+
+
+def current_metrics() -> Metrics | None:
+    return _current.get()
+
+
+@contextmanager
+def profile(path: str | os.PathLike[str] | None = None) -> Iterator[Metrics]:
+    metrics = Metrics()
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+        if path is not None:
+            metrics.save(path)
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[dict[str, Any]]:
+    metrics = _current.get()
+    if metrics is None:
+        yield attrs
+        return
+    with metrics.span(name, **attrs) as attrs:
+        yield attrs
+
+
+@contextmanager
+def tags(**attrs: Any) -> Iterator[None]:
+    # 안에서 만드는 span에 sheet, lang 등을 붙인다
+    token = _tags.set({**_tags.get(), **attrs})
+    try:
+        yield
+    finally:
+        _tags.reset(token)
+
+
+def _traced(
+    tags_: dict[str, Any], fn: Callable[..., Any], *args: Any
+) -> tuple[Any, list[Span]]:
+    with profile() as metrics, tags(**tags_):
+        result = fn(*args)
+    return result, metrics.spans
+
+
+async def run_in_executor(pool: Executor, fn: Callable[..., Any], *args: Any) -> Any:
+    # 다른 프로세스의 span은 결과와 함께 돌려받아 합친다
+    loop = asyncio.get_running_loop()
+    metrics = _current.get()
+    if metrics is None:
+        return await loop.run_in_executor(pool, fn, *args)
+    result, spans = await loop.run_in_executor(pool, _traced, _tags.get(), fn, *args)
+    metrics.extend(spans)
+    return result
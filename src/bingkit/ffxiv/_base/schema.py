@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import codecs
+import csv
+import json
+import os
+import threading
+from pathlib import Path
+
+import polars as pl
+from loguru import logger
+
+TYPE_MAP: dict[str, pl.DataType] = {
+    "str": pl.String(),
+    "bool": pl.Boolean(),
+    "sbyte": pl.Int8(),
+    "byte": pl.UInt8(),
+    "int16": pl.Int16(),
+    "uint16": pl.UInt16(),
+    "int32": pl.Int32(),
+    "uint32": pl.UInt32(),
+    "int64": pl.Int64(),
+    "uint64": pl.UInt64(),
+    "single": pl.Float32(),
+    "float": pl.Float32(),
+    "double": pl.Float64(),
+    "Image": pl.UInt32(),
+    "Color": pl.UInt32(),
+}
+
+
+def to_dtype(type_name: str) -> pl.DataType:
+    if type_name.startswith("bit&"):
+        return pl.Boolean()
+    # 다른 시트를 참조하는 열은 값의 형태가 제각각이므로 문자열로 둔다
+    return TYPE_MAP.get(type_name, pl.String())
+
+
+def read_header(
+    source: bytes | str | os.PathLike[str], size: int = 1 << 16
+) -> tuple[list[str], list[str] | None]:
+    if isinstance(source, bytes):
+        head = source[:size]
+    else:
+        with Path(source).open("rb") as file:
+            head = file.read(size)
+    text = head.removeprefix(codecs.BOM_UTF8).decode("utf-8", errors="replace")
+    lines = text.splitlines()[:3]
+    rows = list(csv.reader(lines))
+    if text.startswith("#"):
+        return rows[0], None
+    if len(rows) < 3:
+        msg = "CSV header is shorter than the expected key/name/type rows"
+        raise ValueError(msg)
+    return rows[1], rows[2]
+
+
+class SchemaRegistry:
+    def __init__(self, path: str | os.PathLike[str] | None = None):
+        self.path = None if path is None else Path(path)
+        self._schemas: dict[str, dict[str, str]] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        if self.path is not None and self.path.exists():
+            try:
+                self._schemas = json.loads(self.path.read_bytes())
+            except json.JSONDecodeError:
+                logger.warning(f"broken schema registry {self.path}, starting fresh")
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._schemas
+
+    def learn(self, name: str, header: list[str], types: list[str]) -> None:
+        schema = {col: typ for col, typ in zip(header, types) if col}
+        with self._lock:
+            if self._schemas.get(name) != schema:
+                self._schemas[name] = schema
+                self._dirty = True
+
+    def get(
+        self, name: str, columns: list[str] | None = None
+    ) -> dict[str, pl.DataType] | None:
+        schema = self._schemas.get(name)
+        if schema is None:
+            return None
+        if columns is None:
+            columns = list(schema)
+        return {col: to_dtype(schema.get(col, "str")) for col in columns}
+
+    def save(self) -> None:
+        if self.path is None or not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._schemas, indent=2), encoding="utf-8")
+        tmp.replace(self.path)
+        self._dirty = False
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import os
+import random
+from pathlib import Path
+
+import httpr
+import polars as pl
+from loguru import logger
+
+from .cache import CacheEntry, CsvCache
+from .defaults import RETRY_ATTEMPTS, RETRY_BACKOFF
+from .download import current_downloader, download_session
+from .manifest import Manifest
+from .metrics import span, tags
+from .schema import SchemaRegistry, read_header, to_dtype
+
+SCHEMAS = SchemaRegistry()
+
+
+class FetchError(ValueError):
+    def __init__(self, url: str, status_code: int):
+        super().__init__(f"Failed to fetch CSV from {url}: {status_code}")
+        self.url = url
+        self.status_code = status_code
+
+    @property
+    def retryable(self) -> bool:
+        return self.status_code == 429 or self.status_code >= 500
+
+
+def is_transient(e: BaseException) -> bool:
+    # 다시 시도하면 성공할 수 있는 네트워크 오류만, 파싱 오류 등은 바로 실패한다
+    if isinstance(e, FetchError):
+        return e.retryable
+    if isinstance(e, httpr.UnsupportedProtocol | httpr.LocalProtocolError):
+        return False
+    return isinstance(e, httpr.TransportError | ConnectionError | TimeoutError)
+
+
+def _source_size(source: bytes | str | os.PathLike[str]) -> int:
+    if isinstance(source, bytes):
+        return len(source)
+    return Path(source).stat().st_size
+
+
+def parse_csv(
+    source: bytes | str | os.PathLike[str],
+    columns: list[str] | None = None,
+    schema: dict[str, pl.DataType] | None = None,
+) -> pl.DataFrame:
+    with span("parse", bytes=_source_size(source)) as attrs:
+        df = _parse_csv(source, columns, schema)
+        attrs["rows"] = df.height
+    return df
+
+
+def _parse_csv(
+    source: bytes | str | os.PathLike[str],
+    columns: list[str] | None = None,
+    schema: dict[str, pl.DataType] | None = None,
+) -> pl.DataFrame:
+    header, types = read_header(source)
+    skip = 0 if types is None else 1
+    if schema is None and types is not None:
+        schema = {col: to_dtype(typ) for col, typ in zip(header, types) if col}
+
+    if schema is not None:
+        if columns is not None:
+            schema = {col: schema[col] for col in columns if col in schema}
+        try:
+            return _read_csv(
+                source,
+                columns,
+                skip_rows=skip,
+                skip_rows_after_header=skip,
+                schema_overrides=schema,
+                infer_schema_length=0,
+            )
+        except pl.exceptions.ComputeError as e:
+            reason = str(e).splitlines()[0]
+            logger.warning(f"schema mismatch, falling back to inference: {reason}")
+
+    return _read_csv(
+        source,
+        columns,
+        skip_rows=skip,
+        skip_rows_after_header=skip,
+        infer_schema_length=30000,
+    )
+
+
+def _read_csv(
+    source: bytes | str | os.PathLike[str], columns: list[str] | None, **options
+) -> pl.DataFrame:
+    if isinstance(source, bytes):
+        return pl.read_csv(source, columns=columns, **options)
+    # 파일은 scan으로 열어서 필요한 열만 메모리 맵에서 읽는다
+    lf = pl.scan_csv(source, **options)
+    if columns is not None:
+        lf = lf.select(columns)
+    return lf.collect()
+
+
+def parse_sheet(
+    source: bytes | str | os.PathLike[str],
+    name: str,
+    columns: list[str] | None = None,
+    schemas: SchemaRegistry | None = None,
+) -> pl.DataFrame:
+    schemas = SCHEMAS if schemas is None else schemas
+    header, types = read_header(source)
+    if types is not None:
+        schemas.learn(name, header, types)
+    return parse_csv(source, columns, schemas.get(name))
+
+
+def parse_slot() -> contextlib.AbstractAsyncContextManager:
+    downloader = current_downloader()
+    if downloader is None:
+        return contextlib.nullcontext()
+    return downloader.parse_limit
+
+
+async def _download(url: str, headers: dict[str, str] | None = None):
+    downloader = current_downloader()
+    if downloader is None:
+        async with download_session() as downloader:
+            return await downloader.get(url, headers=headers)
+    return await downloader.get(url, headers=headers)
+
+
+async def get_csv(
+    url: str,
+    columns: list[str] | None = None,
+):
+    resp = await _download(url)
+    if resp.status_code != 200:
+        raise FetchError(url, resp.status_code)
+    async with parse_slot():
+        return await asyncio.to_thread(parse_csv, resp.content, columns)
+
+
+async def _load_cached(
+    cache: CsvCache, entry: CacheEntry, name: str, columns: list[str] | None
+) -> pl.DataFrame:
+    async with parse_slot():
+        df = await asyncio.to_thread(cache.read_parsed, entry, columns)
+        if df is not None:
+            return df
+        path = cache.blob_path(entry.sha256)
+        df = await asyncio.to_thread(parse_sheet, path, name, columns, cache.schemas)
+    if name in cache.schemas:
+        await asyncio.to_thread(cache.write_parsed, entry, columns, df)
+    return df
+
+
+async def get_sheet(
+    name: str,
+    lang: str,
+    columns: list[str] | None = None,
+) -> pl.DataFrame:
+    from .source import get_source
+
+    # 안에서 기록하는 fetch, parse span에 시트와 언어를 붙인다
+    with tags(sheet=name, lang=lang):
+        return await get_source(lang).get_sheet(name, lang, columns)
+
+
+async def get_sheet_retry(
+    name: str,
+    lang: str,
+    columns: list[str] | None = None,
+    attempts: int = RETRY_ATTEMPTS,
+    backoff: float = RETRY_BACKOFF,
+) -> pl.DataFrame:
+    for attempt in range(1, attempts + 1):
+        try:
+            return await get_sheet(name, lang, columns)
+        except Exception as e:
+            if not is_transient(e) or attempt == attempts:
+                raise
+            reason = e
+        delay = backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+        logger.warning(
+            f"{lang}/{name}: {reason}, retry {attempt}/{attempts - 1} in {delay:.1f}s"
+        )
+        await asyncio.sleep(delay)
+    msg = "attempts must be at least 1"
+    raise ValueError(msg)
+
+
+async def fetch_sheet(
+    name: str,
+    lang: str,
+    columns: list[str] | None = None,
+    manifest: Manifest | None = None,
+    attempts: int = RETRY_ATTEMPTS,
+    backoff: float = RETRY_BACKOFF,
+) -> pl.DataFrame | None:
+    # 실패해도 예외를 올리지 않고 manifest에 기록한 뒤 None을 돌려준다
+    key = Manifest.key(name, lang)
+    if manifest is not None:
+        df = await asyncio.to_thread(manifest.load_part, name, lang, columns)
+        if df is not None:
+            return df
+    try:
+        df = await get_sheet_retry(name, lang, columns, attempts, backoff)
+    except Exception as e:
+        logger.error(f"{key}: {e}")
+        if manifest is not None:
+            manifest.fail(key, e)
+        return None
+    if manifest is not None:
+        sha256 = await asyncio.to_thread(manifest.write_part, name, lang, df)
+        manifest.done(key, sha256, columns)
+    return df
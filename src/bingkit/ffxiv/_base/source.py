@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Protocol
+
+import polars as pl
+
+from . import BASE_URL, LANG
+from .download import current_downloader
+from .metrics import span
+from .sheet import FetchError, _download, _load_cached, parse_sheet, parse_slot
+
+REMOTE_PROTOCOLS = ("http", "https")
+
+
+class Source(Protocol):
+    async def get_sheet(
+        self, name: str, lang: str, columns: list[str] | None = None
+    ) -> pl.DataFrame: ...
+
+    def size(self, name: str, lang: str) -> int | None: ...
+
+
+def _template(spec: str) -> str:
+    # 이름 자리가 없으면 폴더나 URL 아래의 {name}.csv로 본다
+    if "{name}" in spec:
+        return spec
+    return spec.rstrip("/") + "/{name}.csv"
+
+
+@dataclass
+class HttpSource:
+    template: str
+
+    def url(self, name: str) -> str:
+        return self.template.format(name=name)
+
+    def size(self, name: str, lang: str) -> int | None:
+        downloader = current_downloader()
+        cache = None if downloader is None else downloader.cache
+        entry = None if cache is None else cache.get(lang, name, self.url(name))
+        return None if entry is None else entry.size
+
+    async def get_sheet(
+        self, name: str, lang: str, columns: list[str] | None = None
+    ) -> pl.DataFrame:
+        url = self.url(name)
+        downloader = current_downloader()
+        cache = downloader.cache if downloader is not None else None
+        if cache is None:
+            resp = await _download(url)
+            if resp.status_code != 200:
+                raise FetchError(url, resp.status_code)
+            async with parse_slot():
+                return await asyncio.to_thread(parse_sheet, resp.content, name, columns)
+
+        entry = cache.get(lang, name, url)
+        if cache.offline:
+            if entry is None:
+                msg = f"{lang}/{name} is not cached, cannot fetch it in offline mode"
+                raise FileNotFoundError(msg)
+            cache.touch(entry)
+            return await _load_cached(cache, entry, name, columns)
+
+        resp = await _download(url, cache.validators(entry))
+        if resp.status_code == 304 and entry is not None:
+            cache.touch(entry, revalidated=True)
+            return await _load_cached(cache, entry, name, columns)
+        if resp.status_code != 200:
+            raise FetchError(url, resp.status_code)
+
+        entry = await asyncio.to_thread(
+            cache.put,
+            lang,
+            name,
+            url,
+            resp.content,
+            resp.headers.get("etag") or None,
+            resp.headers.get("last-modified") or None,
+        )
+        return await _load_cached(cache, entry, name, columns)
+
+
+@dataclass
+class LocalSource:
+    # git clone 등 로컬 폴더, 예: /mnt/ffxiv-datamining/csv/en/{name}.csv
+    template: str
+
+    def path(self, name: str) -> Path:
+        return Path(self.template.format(name=name)).expanduser()
+
+    def size(self, name: str, lang: str) -> int | None:
+        path = self.path(name)
+        return path.stat().st_size if path.exists() else None
+
+    async def get_sheet(
+        self, name: str, lang: str, columns: list[str] | None = None
+    ) -> pl.DataFrame:
+        path = self.path(name)
+        if not path.is_file():
+            msg = f"{lang}/{name}: {str(path)!r} does not exist"
+            raise FileNotFoundError(msg)
+        # HTTP 클라이언트와 캐시를 거치지 않고 파일을 바로 scan한다
+        async with parse_slot():
+            return await asyncio.to_thread(parse_sheet, path, name, columns)
+
+
+@dataclass
+class FsspecSource:
+    # s3://, gcs://, github:// 등 fsspec이 읽을 수 있는 URL
+    template: str
+    storage_options: dict[str, Any] = field(default_factory=dict)
+
+    def url(self, name: str) -> str:
+        return self.template.format(name=name)
+
+    def size(self, name: str, lang: str) -> int | None:
+        return None
+
+    async def get_sheet(
+        self, name: str, lang: str, columns: list[str] | None = None
+    ) -> pl.DataFrame:
+        from fsspec.core import url_to_fs
+
+        url = self.url(name)
+        fs, path = url_to_fs(url, **self.storage_options)
+        with span("fetch", url=url) as attrs:
+            data = await asyncio.to_thread(fs.cat_file, path)
+            attrs["bytes"] = len(data)
+        async with parse_slot():
+            return await asyncio.to_thread(parse_sheet, data, name, columns)
+
+
+def parse_source(spec: str | os.PathLike[str]) -> Source:
+    spec = os.fspath(spec)
+    protocol, sep, _ = spec.partition("://")
+    if not sep or protocol == "file":
+        return LocalSource(_template(spec.removeprefix("file://")))
+    if protocol in REMOTE_PROTOCOLS:
+        return HttpSource(_template(spec))
+    return FsspecSource(_template(spec))
+
+
+def parse_source_options(items: list[str]) -> dict[str, Source]:
+    # LANG=경로 또는 URL
+    sources = {}
+    for item in items:
+        lang, sep, spec = item.partition("=")
+        if not sep or not spec:
+            msg = f"source must be LANG=PATH_OR_URL, got {item!r}"
+            raise ValueError(msg)
+        if lang not in LANG:
+            msg = f"unknown language {lang!r}, choose from {', '.join(LANG)}"
+            raise ValueError(msg)
+        sources[lang] = parse_source(spec)
+    return sources
+
+
+_sources: ContextVar[Mapping[str, Source] | None] = ContextVar("sources", default=None)
+
+
+def get_source(lang: str) -> Source:
+    sources = _sources.get()
+    if sources is not None and lang in sources:
+        return sources[lang]
+    return HttpSource(BASE_URL[lang])
+
+
+@contextmanager
+def use_sources(
+    sources: Mapping[str, Source | str | os.PathLike[str]] | None,
+) -> Iterator[dict[str, Source]]:
+    # 지정하지 않은 언어는 BASE_URL에서 HTTP로 받는다
+    current = dict(_sources.get() or {})
+    for lang, source in (sources or {}).items():
+        current[lang] = (
+            parse_source(source) if isinstance(source, str | os.PathLike) else source
+        )
+    token = _sources.set(current)
+    try:
+        yield current
+    finally:
+        _sources.reset(token)
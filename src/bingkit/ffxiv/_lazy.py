@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import importlib
+import sys
+from collections.abc import Callable
+
+
+def lazy_exports(
+    package: str, exports: dict[str, str]
+) -> tuple[Callable[[str], object], Callable[[], list[str]]]:
+    # PEP 562: 이름을 처음 쓸 때 모듈을 불러오고, 다음부터는 바로 쓰도록 저장한다
+    def getattr_(name: str) -> object:
+        if name not in exports:
+            msg = f"module {package!r} has no attribute {name!r}"
+            raise AttributeError(msg)
+        module = importlib.import_module(exports[name], package)
+        value = getattr(module, name)
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def dir_() -> list[str]:
+        return sorted({*vars(sys.modules[package]), *exports})
+
+    return getattr_, dir_
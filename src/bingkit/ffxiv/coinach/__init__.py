@@ -1,3 +1,6 @@
+from bingkit.ffxiv._base import INDEX_NAMES
+
 from .coinach import main as coinach
+from .index import compile_index, load_index
 
-__all__ = ["coinach"]
+__all__ = ["INDEX_NAMES", "coinach", "compile_index", "load_index"]
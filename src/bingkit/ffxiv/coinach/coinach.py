@@ -1,56 +1,216 @@
 import asyncio
-import os
+from collections.abc import Iterable, Mapping
 from pathlib import Path
 
 import polars as pl
 from loguru import logger
 from tqdm.asyncio import tqdm
 
-from bingkit.ffxiv._base import BASE_URL, LANG, SHEETS, get_csv
+from bingkit.ffxiv._base import (
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_PER_HOST,
+    LANG,
+    RETRY_ATTEMPTS,
+    SHEETS,
+    CsvCache,
+    Manifest,
+    OutputFormat,
+    Source,
+    download_session,
+    fetch_sheet,
+    join_languages,
+    span,
+    tags,
+    use_sources,
+    write_frame,
+)
 
 
-async def download_csv(url: str, output: str | os.PathLike[str]):
-    df = await get_csv(url)
-    df.write_csv(Path(output))
-    logger.info(f"csv saved at {output}")
+def csv_path(output: Path, name: str, lang: str) -> Path:
+    return output.joinpath(f"{name}.{lang}.csv")
 
 
-async def fetch(output: Path, name: str):
-    total = len(LANG)
-    pbar = tqdm(total=total)
+async def fetch_lang(
+    output: Path,
+    name: str,
+    lang: str,
+    save_csv: bool = False,
+    manifest: Manifest | None = None,
+    attempts: int = RETRY_ATTEMPTS,
+) -> pl.DataFrame | pl.LazyFrame | None:
+    use_cols = ["#", *SHEETS[name]]
+    columns = None if save_csv else use_cols
+    df = await fetch_sheet(name, lang, columns, manifest, attempts)
+    if df is None:
+        return None
+    if save_csv:
+        path = csv_path(output, name, lang)
+        await asyncio.to_thread(df.write_csv, path)
+        logger.info(f"csv saved at {path}")
+    if manifest is None:
+        return df.select(use_cols)
+    # 받은 시트는 .parts에 저장되어 있으므로 메모리에서 내리고 합칠 때 파일에서 읽는다
+    return manifest.scan_part(name, lang).select(use_cols)
 
+
+async def fetch(
+    output: Path,
+    name: str,
+    save_csv: bool = False,
+    pbar: tqdm | None = None,
+    manifest: Manifest | None = None,
+    attempts: int = RETRY_ATTEMPTS,
+) -> dict[str, pl.DataFrame | pl.LazyFrame] | None:
+    tasks = {}
     async with asyncio.TaskGroup() as tg:
-        for lang, baseurl in BASE_URL.items():
-            url = baseurl.format(name=name)
-            name_with_lang = f"{name}.{lang}.csv"
-            file_path = output.joinpath(name_with_lang)
-            fut = download_csv(url, file_path)
-            tg.create_task(fut).add_done_callback(lambda _: pbar.update())
+        for lang in LANG:
+            coro = fetch_lang(output, name, lang, save_csv, manifest, attempts)
+            task = tg.create_task(coro)
+            if pbar is not None:
+                task.add_done_callback(lambda _: pbar.update())
+            tasks[lang] = task
+    frames = {lang: task.result() for lang, task in tasks.items()}
+    if any(df is None for df in frames.values()):
+        return None
+    return frames
 
-    pbar.close()
+
+def combine_frames(frames: Mapping[str, pl.DataFrame | pl.LazyFrame]) -> pl.DataFrame:
+    with span("join") as attrs:
+        df = join_languages(frames)
+        attrs.update(rows=df.height, bytes=df.estimated_size())
+    return df
+
+
+def combine(output: Path, name: str) -> pl.DataFrame:
+    use_cols = ["#", *SHEETS[name]]
+    frames = {
+        lang: pl.scan_csv(csv_path(output, name, lang)).select(use_cols)
+        for lang in LANG
+    }
+    with tags(sheet=name):
+        return combine_frames(frames)
+
+
+def concat(
+    output: Path,
+    name: str,
+    formats: Iterable[OutputFormat] = (OutputFormat.xlsx,),
+):
+    all_df = combine(output, name)
+    save_path = output.joinpath(f"{name}.all")
+    write_frame(all_df, save_path, formats)
 
 
-def concat(output: Path, name: str):
-    csv_files = list(output.glob(f"{name}*.csv"))
-    csv_files.sort(key=lambda x: LANG.index(x.stem.split(".")[-1]))
-    use_cols = SHEETS[name]
-    dfs = []
-    for file in csv_files:
-        ln = file.stem.split(".")[-1]
-        df = pl.scan_csv(file).select(use_cols)
-        columns = df.collect_schema().names()
-        df = df.rename(mapping={col: f"{col}_{ln}" for col in columns}).collect()
-        dfs.append(df)
-    all_df = pl.concat(dfs, how="horizontal")
-    save_path = output.joinpath(f"{name}.all.xlsx")
-    all_df.write_excel(save_path)
+async def build(
+    output: Path,
+    name: str,
+    formats: Iterable[OutputFormat] = (OutputFormat.xlsx,),
+    save_csv: bool = False,
+    pbar: tqdm | None = None,
+    manifest: Manifest | None = None,
+    attempts: int = RETRY_ATTEMPTS,
+) -> list[Path]:
+    frames = await fetch(output, name, save_csv, pbar, manifest, attempts)
+    if frames is None:
+        return []
+    with tags(sheet=name):
+        all_df = await asyncio.to_thread(combine_frames, frames)
+        save_path = output.joinpath(f"{name}.all")
+        saved = await asyncio.to_thread(write_frame, all_df, save_path, formats)
+    if manifest is not None:
+        manifest.finish(name, saved, LANG)
+    logger.info(f"{name} saved at {', '.join(map(str, saved))}")
+    return saved
 
 
-async def entry(output: Path, name: str):
+async def _run_sheet(name: str, manifest: Manifest, *args, **kwargs) -> list[Path]:
+    try:
+        return await build(*args, manifest=manifest, **kwargs)
+    except Exception as e:
+        logger.exception(f"{name}: {e}")
+        manifest.fail(Manifest.key(name), e)
+        return []
+
+
+async def entry(
+    output: Path,
+    names: Iterable[str],
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    per_host: int = DEFAULT_PER_HOST,
+    cache: CsvCache | None = None,
+    formats: Iterable[OutputFormat] = (OutputFormat.xlsx,),
+    save_csv: bool = False,
+    resume: bool = False,
+    attempts: int = RETRY_ATTEMPTS,
+    sources: Mapping[str, Source | str] | None = None,
+) -> dict[str, str | None]:
+    names = list(dict.fromkeys(names))
+    unknown = [name for name in names if name not in SHEETS]
+    if unknown:
+        msg = f"unknown sheet: {', '.join(unknown)}, choose from {', '.join(SHEETS)}"
+        raise ValueError(msg)
+
     output.mkdir(parents=True, exist_ok=True)
-    await fetch(output, name)
-    concat(output, name)
+    formats = list(formats)
+    manifest = Manifest(output, resume)
+    todo = [name for name in names if not manifest.is_done(name)]
+    if len(todo) < len(names):
+        logger.info(f"resume: {len(names) - len(todo)} sheets already done")
+    manifest.save()
+
+    pbar = tqdm(total=len(todo) * len(LANG))
+    # 다운로드가 끝난 시트부터 바로 저장하므로 다운로드와 쓰기가 겹쳐서 진행된다
+    with use_sources(sources):
+        async with (
+            download_session(max_concurrency, per_host, cache),
+            asyncio.TaskGroup() as tg,
+        ):
+            for name in todo:
+                coro = _run_sheet(
+                    name,
+                    manifest,
+                    output,
+                    name,
+                    formats,
+                    save_csv,
+                    pbar,
+                    attempts=attempts,
+                )
+                tg.create_task(coro)
+    pbar.close()
+
+    failed = manifest.failed()
+    if failed:
+        logger.error(
+            f"{len(failed)} items failed, run again with --resume: {', '.join(failed)}"
+        )
+    return failed
 
 
-def main(output: Path, name: str):
-    asyncio.run(entry(output, name))
+def main(
+    output: Path,
+    names: Iterable[str],
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    per_host: int = DEFAULT_PER_HOST,
+    cache: CsvCache | None = None,
+    formats: Iterable[OutputFormat] = (OutputFormat.xlsx,),
+    save_csv: bool = False,
+    resume: bool = False,
+    attempts: int = RETRY_ATTEMPTS,
+    sources: Mapping[str, Source | str] | None = None,
+) -> dict[str, str | None]:
+    return asyncio.run(
+        entry(
+            output,
+            names,
+            max_concurrency,
+            per_host,
+            cache,
+            formats,
+            save_csv,
+            resume,
+            attempts,
+            sources,
+        )
+    )
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import json
+from functools import lru_cache
+from pathlib import Path
+
+import polars as pl
+from loguru import logger
+
+from bingkit.ffxiv._base import (
+    INDEX_NAMES,
+    LANG,
+    find_frame,
+    frame_candidates,
+    read_file,
+)
+
+from .coinach import combine, csv_path
+
+
+def build_index(df: pl.DataFrame) -> pl.DataFrame:
+    # 첫 번째 텍스트 열의 언어별 열을 쓴다, 예전 파일에는 # 열이 없을 수 있다
+    first = next(col for col in df.columns if col != "#")
+    base = first.removesuffix(f"_{LANG[0]}")
+    names = [f"{base}_{lang}" for lang in LANG]
+    return (
+        df.select(names)
+        .rename(dict(zip(names, LANG)))
+        .with_columns(pl.col("en").str.to_lowercase().alias("_key"), _hit=True)
+        .drop_nulls("_key")
+        .unique("_key", keep="last", maintain_order=True)
+    )
+
+
+def index_path(output: Path, name: str) -> Path:
+    return output.joinpath(f"{name}.index.arrow")
+
+
+def candidates(output: Path, name: str) -> list[Path]:
+    # 인덱스를 만들 수 있는 모든 파일, 어느 하나라도 바뀌면 다시 만든다
+    csv_files = [csv_path(output, name, lang) for lang in LANG]
+    return [
+        *frame_candidates(output.joinpath(f"{name}.all")),
+        *(file for file in csv_files if file.exists()),
+    ]
+
+
+def sources(output: Path, name: str) -> list[Path]:
+    # .all 파일과 언어별 CSV 중 더 최근에 저장한 것
+    found = find_frame(output.joinpath(f"{name}.all"))
+    csv_files = [csv_path(output, name, lang) for lang in LANG]
+    if not all(file.exists() for file in csv_files):
+        return [] if found is None else [found]
+    if found is None:
+        return csv_files
+    csv_mtime = max(file.stat().st_mtime_ns for file in csv_files)
+    return [found] if found.stat().st_mtime_ns >= csv_mtime else csv_files
+
+
+def fingerprint(paths: list[Path]) -> dict[str, list[int]]:
+    result = {}
+    for path in paths:
+        stat = path.stat()
+        result[path.name] = [stat.st_size, stat.st_mtime_ns]
+    return result
+
+
+def _read_meta(output: Path, name: str) -> dict[str, list[int]] | None:
+    meta_path = index_path(output, name).with_suffix(".json")
+    if not meta_path.exists() or not index_path(output, name).exists():
+        return None
+    return json.loads(meta_path.read_bytes())
+
+
+def compile_index(output: Path, name: str) -> Path:
+    paths = sources(output, name)
+    if not paths:
+        msg = f"no {name} data in {str(output)!r}, run 'bingkit-ffxiv coinach {name}' first"
+        raise FileNotFoundError(msg)
+    df = combine(output, name) if paths[0].suffix == ".csv" else read_file(paths[0])
+
+    save_path = index_path(output, name)
+    tmp = save_path.with_name(f".{save_path.name}.tmp")
+    build_index(df).write_ipc(tmp, compression="uncompressed")
+    tmp.replace(save_path)
+    save_path.with_suffix(".json").write_text(
+        json.dumps(fingerprint(candidates(output, name))), encoding="utf-8"
+    )
+    logger.info(f"index saved at {save_path}")
+    return save_path
+
+
+def is_stale(output: Path, name: str) -> bool:
+    meta = _read_meta(output, name)
+    if meta is None:
+        return True
+    paths = candidates(output, name)
+    return bool(paths) and meta != fingerprint(paths)
+
+
+# 시트마다 인덱스 하나, coinach 폴더 몇 개를 오가는 정도까지 들고 있는다
+@lru_cache(maxsize=4 * len(INDEX_NAMES))
+def _load(path: Path) -> tuple[int, pl.DataFrame]:
+    return path.stat().st_mtime_ns, pl.read_ipc(path)
+
+
+def load_index(output: str | Path, name: str) -> pl.DataFrame:
+    output = Path(output)
+    if is_stale(output, name):
+        compile_index(output, name)
+    path = index_path(output, name).resolve()
+    mtime_ns, df = _load(path)
+    if mtime_ns != path.stat().st_mtime_ns:
+        # 다시 만든 인덱스, lru_cache는 항목 하나만 지울 수 없으므로 비우고 다시 읽는다
+        _load.cache_clear()
+        _, df = _load(path)
+    return df
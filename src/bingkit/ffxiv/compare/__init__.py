@@ -0,0 +1,15 @@
+from typing import TYPE_CHECKING
+
+from bingkit.ffxiv._lazy import lazy_exports
+
+from .tables import TABLES, Table
+
+if TYPE_CHECKING:
+    from .timeline import build_index, compare, translate
+
+__all__ = ["TABLES", "Table", "build_index", "compare", "translate"]
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {"build_index": ".timeline", "compare": ".timeline", "translate": ".timeline"},
+)
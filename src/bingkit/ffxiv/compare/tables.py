@@ -0,0 +1,16 @@
+from enum import StrEnum
+
+
+class Table(StrEnum):
+    npc = "npc"
+    place = "place"
+    action = "action"
+
+
+# 데이터 파일 이름, 열 이름, 적용할 구역
+# 같은 구역에서는 뒤에 있는 테이블이 우선한다
+TABLES = {
+    Table.npc: ("BNpcName", "Singular", "sync"),
+    Table.place: ("PlaceName", "Name", "sync"),
+    Table.action: ("Action", "Name", "text"),
+}
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import os
+import sys
+from collections.abc import Iterable
+from pathlib import Path
+
+import polars as pl
+from loguru import logger
+
+from bingkit.ffxiv._base import read_frame, span
+
+from .tables import TABLES, Table
+
+RSV_PREFIX = "_rsv_"
+LINE_PATTERN = r"(?P<space> *)'(?P<en>.*?)': '.*',"
+
+
+def normalize(expr: pl.Expr) -> pl.Expr:
+    return (
+        expr.str.replace_all("\\'", "'", literal=True)
+        .str.replace_all("Pandaemon", "Pandæmon", literal=True)
+        .str.replace(r"\(.*\)", "")
+        .str.to_lowercase()
+    )
+
+
+def load_table(data_dir: Path, table: Table) -> pl.DataFrame:
+    name, column, section = TABLES[table]
+    ko = pl.col(f"{column}_ko")
+    return (
+        read_frame(data_dir.joinpath(name))
+        .lazy()
+        .filter(ko.is_not_null() & ko.ne("") & ~ko.str.starts_with(RSV_PREFIX))
+        .select(
+            pl.lit(section).alias("section"),
+            pl.col(f"{column}_en").str.to_lowercase().alias("_key"),
+            ko.alias("ko"),
+        )
+        .collect()
+    )
+
+
+def build_index(
+    data_dir: str | os.PathLike[str], tables: Iterable[Table] | None = None
+) -> pl.DataFrame:
+    data_dir = Path(data_dir)
+    selected = set(TABLES if tables is None else tables)
+    frames = [load_table(data_dir, table) for table in TABLES if table in selected]
+    return pl.concat(frames).unique(
+        ["section", "_key"], keep="last", maintain_order=True
+    )
+
+
+def translate(lines: list[str], index: pl.DataFrame) -> tuple[list[str], int]:
+    line = pl.col("line")
+    section = (
+        pl.when(line.str.contains("replaceText", literal=True))
+        .then(pl.lit("text"))
+        .when(line.str.contains("replaceSync", literal=True))
+        .then(pl.lit("sync"))
+        .forward_fill()
+        .fill_null("sync")
+    )
+    ko = pl.col("ko")
+    ko = pl.when(ko.str.contains(RSV_PREFIX, literal=True)).then("en").otherwise(ko)
+    row = pl.concat_str("space", pl.lit("'"), "en", pl.lit("': '"), ko, pl.lit("',\n"))
+
+    df = (
+        pl.DataFrame({"line": lines}, schema={"line": pl.String})
+        .with_columns(
+            section.alias("section"),
+            line.str.extract_groups(LINE_PATTERN).alias("match"),
+        )
+        .unnest("match")
+        .with_columns(normalize(pl.col("en")).alias("_key"))
+        .join(index, on=["section", "_key"], how="left", maintain_order="left")
+    )
+    hit = pl.col("ko").is_not_null()
+    result = df.select(
+        pl.when(hit).then(row).otherwise(line).alias("line"), hit.alias("hit")
+    )
+    return result["line"].to_list(), int(result["hit"].sum())
+
+
+def compare(
+    input_file: str | os.PathLike[str] = "input.txt",
+    output_file: str | os.PathLike[str] = "output.txt",
+    data_dir: str | os.PathLike[str] = "data",
+    tables: Iterable[Table] | None = None,
+) -> int:
+    index = build_index(data_dir, tables)
+
+    if str(input_file) == "-":
+        lines = list(sys.stdin)
+    else:
+        with Path(input_file).open(encoding="utf-8") as file:
+            lines = list(file)
+
+    with span("lookup", rows=len(lines)) as attrs:
+        lines, count = translate(lines, index)
+        attrs["hits"] = count
+
+    if str(output_file) == "-":
+        sys.stdout.writelines(lines)
+    else:
+        with Path(output_file).open("w", encoding="utf-8") as file:
+            file.writelines(lines)
+    logger.info(f"{count} lines translated")
+    return count
@@ -0,0 +1,3 @@
+from .diff import diff, diff_frames, load_snapshot
+
+__all__ = ["diff", "diff_frames", "load_snapshot"]
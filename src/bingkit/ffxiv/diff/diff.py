@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import polars as pl
+from loguru import logger
+
+from bingkit.ffxiv._base import OutputFormat, read_file, write_frame
+from bingkit.ffxiv.rsv.replace import get_rsv_mapping, mapping_frame
+from bingkit.ffxiv.rsv.store import is_store
+
+CHANGE = "_change"
+NDJSON_SUFFIXES = (".jsonl", ".ndjson")
+
+
+def load_snapshot(path: str | os.PathLike[str]) -> pl.DataFrame:
+    path = Path(path)
+    if path.suffix == ".json" or is_store(path):
+        return mapping_frame(get_rsv_mapping(path))
+    return read_file(path)
+
+
+def detect_key(df: pl.DataFrame) -> str:
+    for key in ("#", "key"):
+        if key in df.columns:
+            return key
+    msg = f"cannot find a key column in {df.columns}, use --key"
+    raise ValueError(msg)
+
+
+def diff_frames(old: pl.DataFrame, new: pl.DataFrame, key: str) -> pl.DataFrame:
+    for name, df in (("old", old), ("new", new)):
+        if key not in df.columns:
+            msg = f"{name} snapshot has no {key!r} column"
+            raise ValueError(msg)
+        if df[key].is_duplicated().any():
+            logger.warning(f"{name} snapshot has duplicated {key!r}, keeping the last")
+
+    old = old.unique(key, keep="last", maintain_order=True)
+    new = new.unique(key, keep="last", maintain_order=True)
+    # 두 스냅샷에 모두 있는 열만 비교하고, 타입은 새 스냅샷에 맞춘다
+    common = [col for col in new.columns if col in old.columns and col != key]
+    old = old.with_columns(
+        pl.col(col).cast(new.schema[col], strict=False) for col in [key, *common]
+    )
+
+    added = new.join(old, on=key, how="anti")
+    removed = old.join(new, on=key, how="anti")
+    joined = new.join(old.select(key, *common), on=key, how="inner", suffix="_old")
+    if common:
+        mask = pl.any_horizontal(
+            pl.col(col).ne_missing(pl.col(f"{col}_old")) for col in common
+        )
+        changed = joined.filter(mask).select(new.columns)
+    else:
+        changed = joined.clear().select(new.columns)
+
+    return pl.concat(
+        [
+            added.select(pl.lit("added").alias(CHANGE), pl.all()),
+            removed.select(pl.lit("removed").alias(CHANGE), pl.all()),
+            changed.select(pl.lit("changed").alias(CHANGE), pl.all()),
+        ],
+        how="diagonal_relaxed",
+    )
+
+
+def summary(delta: pl.DataFrame) -> dict[str, int]:
+    counts = dict(delta[CHANGE].value_counts().iter_rows())
+    return {change: counts.get(change, 0) for change in ("added", "removed", "changed")}
+
+
+def write_delta(delta: pl.DataFrame, output: str | os.PathLike[str]) -> None:
+    if str(output) == "-":
+        sys.stdout.write(delta.write_ndjson())
+        return
+    output = Path(output)
+    if output.suffix == ".json":
+        # RSV 변경 내역은 replace -r 에 바로 넘길 수 있는 매핑으로 저장한다
+        if not {"key", "value"} <= set(delta.columns):
+            msg = ".json output is only supported for RSV mappings"
+            raise ValueError(msg)
+        upserts = delta.filter(pl.col(CHANGE) != "removed")
+        mapping = dict(zip(upserts["key"], upserts["value"]))
+        output.write_text(
+            json.dumps(mapping, indent=2, ensure_ascii=False), encoding="utf-8"
+        )
+    elif output.suffix in NDJSON_SUFFIXES:
+        delta.write_ndjson(output)
+    else:
+        write_frame(delta, output, [OutputFormat.from_path(output)])
+    logger.info(f"delta saved at {output}")
+
+
+def diff(
+    old: str | os.PathLike[str],
+    new: str | os.PathLike[str],
+    output: str | os.PathLike[str] | None = "-",
+    key: str | None = None,
+) -> pl.DataFrame:
+    old_df = load_snapshot(old)
+    new_df = load_snapshot(new)
+    key = detect_key(new_df) if key is None else key
+    delta = diff_frames(old_df, new_df, key)
+    counts = summary(delta)
+    logger.info(", ".join(f"{count} {change}" for change, count in counts.items()))
+    if output is not None:
+        write_delta(delta, output)
+    return delta
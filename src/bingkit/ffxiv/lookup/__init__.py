@@ -0,0 +1,33 @@
+from typing import TYPE_CHECKING
+
+from bingkit.ffxiv._lazy import lazy_exports
+
+from .modes import Match
+
+if TYPE_CHECKING:
+    from .server import DEFAULT_HOST, DEFAULT_PORT, make_server, serve
+    from .store import TermStore, compile_store, load_store
+
+__all__ = [
+    "DEFAULT_HOST",
+    "DEFAULT_PORT",
+    "Match",
+    "TermStore",
+    "compile_store",
+    "load_store",
+    "make_server",
+    "serve",
+]
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "DEFAULT_HOST": ".server",
+        "DEFAULT_PORT": ".server",
+        "make_server": ".server",
+        "serve": ".server",
+        "TermStore": ".store",
+        "compile_store": ".store",
+        "load_store": ".store",
+    },
+)
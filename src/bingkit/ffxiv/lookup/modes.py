@@ -0,0 +1,9 @@
+from enum import StrEnum
+
+
+class Match(StrEnum):
+    exact = "exact"
+    # 대소문자를 무시
+    ignore_case = "ignore_case"
+    # 대소문자를 무시하고 앞부분이 같은 것
+    prefix = "prefix"
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import functools
+import json
+import os
+import socketserver
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+from loguru import logger
+
+from .modes import Match
+from .store import TermStore
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8731
+MAX_BODY = 16 * 1024**2
+
+
+def _options(params: dict[str, Any]) -> dict[str, Any]:
+    # GET 쿼리와 POST json에서 같은 옵션을 받는다, target과 sheet는 쉼표로 구분해도 된다
+    def split(value: object) -> list[str] | None:
+        if value is None:
+            return None
+        values = [value] if isinstance(value, str) else list(value)
+        return [part for item in values for part in str(item).split(",") if part]
+
+    limit = params.get("limit")
+    return {
+        "source": params.get("source", "en"),
+        "targets": split(params.get("target")),
+        "match": Match(params.get("match", Match.exact)),
+        "sheets": split(params.get("sheet")),
+        "limit": None if limit is None else int(limit),
+    }
+
+
+class LookupHandler(BaseHTTPRequestHandler):
+    # GET /lookup?q=Aetheric%20Boom&target=ko&match=ignore_case
+    # POST /lookup {"queries": [...], "source": "en", "target": ["ko"], "limit": 5}
+    # GET /health
+    def __init__(self, *args, store: TermStore, **kwargs):
+        self.store = store
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        if url.path == "/health":
+            self._send({"terms": len(self.store), "sheets": self.store.sheets})
+            return
+        if url.path != "/lookup":
+            self._send({"error": "not found"}, HTTPStatus.NOT_FOUND)
+            return
+        query = parse_qs(url.query)
+        params: dict[str, Any] = {
+            key: values if key in ("target", "sheet") else values[-1]
+            for key, values in query.items()
+        }
+        self._lookup(query.get("q", []), params)
+
+    def do_POST(self) -> None:
+        if urlsplit(self.path).path != "/lookup":
+            self._send({"error": "not found"}, HTTPStatus.NOT_FOUND)
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY:
+            self._send({"error": "body too large"}, HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+            return
+        try:
+            params = json.loads(self.rfile.read(length) or b"{}")
+            queries = params["queries"]
+        except (ValueError, KeyError, TypeError):
+            msg = 'body must be a json object with "queries"'
+            self._send({"error": msg}, HTTPStatus.BAD_REQUEST)
+            return
+        self._lookup([queries] if isinstance(queries, str) else queries, params)
+
+    def _lookup(self, queries: list[str], params: dict[str, Any]) -> None:
+        try:
+            options = _options(params)
+            results = self.store.lookup_many(queries, **options)
+        except (ValueError, TypeError) as e:
+            self._send({"error": str(e)}, HTTPStatus.BAD_REQUEST)
+            return
+        self._send({"results": results})
+
+    def _send(self, data: object, status: HTTPStatus = HTTPStatus.OK) -> None:
+        body = json.dumps(data, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:  # noqa: A002
+        logger.debug(format % args)
+
+
+def make_server(
+    store: TermStore,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    socket_path: str | os.PathLike[str] | None = None,
+) -> socketserver.BaseServer:
+    handler = functools.partial(LookupHandler, store=store)
+    if socket_path is None:
+        return ThreadingHTTPServer((host, port), handler)
+    server_class = getattr(socketserver, "ThreadingUnixStreamServer", None)
+    if server_class is None:
+        msg = "unix sockets are not supported on this platform, use host and port"
+        raise OSError(msg)
+    Path(socket_path).unlink(missing_ok=True)
+    server = server_class(os.fspath(socket_path), handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve(
+    store: TermStore,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    socket_path: str | os.PathLike[str] | None = None,
+) -> None:
+    # 한 번 읽은 store를 계속 들고 있어서 편집기 플러그인, 스크립트가 바로 찾을 수 있다
+    server = make_server(store, host, port, socket_path)
+    address = socket_path if socket_path is not None else f"http://{host}:{port}"
+    logger.info(f"lookup server listening on {address}, {len(store)} terms")
+    with server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if socket_path is not None:
+                Path(socket_path).unlink(missing_ok=True)
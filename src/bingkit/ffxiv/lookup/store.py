@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+
+import polars as pl
+from loguru import logger
+
+from bingkit.ffxiv._base import LANG, SHEETS, read_file, span
+from bingkit.ffxiv.coinach.coinach import combine
+from bingkit.ffxiv.coinach.index import candidates, fingerprint, sources
+
+from .modes import Match
+
+RSV_PREFIX = "_rsv_"
+STORE_NAME = "lookup.arrow"
+# 접두사 검색에서 범위의 끝으로 쓰는 가장 큰 문자
+MAX_CHAR = "\U0010ffff"
+
+
+def store_path(data_dir: Path) -> Path:
+    return data_dir.joinpath(STORE_NAME)
+
+
+def sheet_terms(df: pl.DataFrame, name: str) -> pl.DataFrame | None:
+    # 시트의 텍스트 열마다 (sheet, field, row, en, de, ...) 모양으로 펼친다
+    row = pl.col("#") if "#" in df.columns else pl.int_range(pl.len())
+    frames = []
+    for field in SHEETS[name]:
+        names = [f"{field}_{lang}" for lang in LANG]
+        missing = [col for col in names if col not in df.columns]
+        if missing:
+            logger.warning(f"{name}: missing columns {', '.join(missing)}, skipped")
+            continue
+        frames.append(
+            df.select(
+                pl.lit(name).alias("sheet"),
+                pl.lit(field).alias("field"),
+                row.cast(pl.Int64).alias("row"),
+                *[
+                    pl.col(col).cast(pl.String).alias(lang)
+                    for col, lang in zip(names, LANG)
+                ],
+            )
+        )
+    if not frames:
+        return None
+    text = [pl.col(lang).is_not_null() & pl.col(lang).ne("") for lang in LANG]
+    return (
+        pl.concat(frames)
+        .filter(pl.any_horizontal(text))
+        # 같은 번역이 여러 행에 있으면 첫 행만 남긴다
+        .unique(["sheet", "field", *LANG], keep="first", maintain_order=True)
+    )
+
+
+def _fingerprints(data_dir: Path) -> dict[str, dict[str, list[int]]]:
+    result = {}
+    for name in SHEETS:
+        paths = candidates(data_dir, name)
+        if paths:
+            result[name] = fingerprint(paths)
+    return result
+
+
+def compile_store(data_dir: str | os.PathLike[str]) -> Path:
+    data_dir = Path(data_dir)
+    found = _fingerprints(data_dir)
+    if not found:
+        msg = f"no sheet data in {str(data_dir)!r}, run 'bingkit-ffxiv coinach --all' first"
+        raise FileNotFoundError(msg)
+    missing = [name for name in SHEETS if name not in found]
+    if missing:
+        logger.warning(f"sheets not found, skipped: {', '.join(missing)}")
+
+    frames = []
+    for name in found:
+        paths = sources(data_dir, name)
+        df = (
+            combine(data_dir, name)
+            if paths[0].suffix == ".csv"
+            else read_file(paths[0])
+        )
+        terms = sheet_terms(df, name)
+        if terms is not None:
+            frames.append(terms)
+
+    save_path = store_path(data_dir)
+    tmp = save_path.with_name(f".{save_path.name}.tmp")
+    pl.concat(frames).write_ipc(tmp, compression="uncompressed")
+    tmp.replace(save_path)
+    save_path.with_suffix(".json").write_text(json.dumps(found), encoding="utf-8")
+    logger.info(f"lookup store saved at {save_path}")
+    return save_path
+
+
+def is_stale(data_dir: Path) -> bool:
+    path = store_path(data_dir)
+    meta_path = path.with_suffix(".json")
+    if not path.exists() or not meta_path.exists():
+        return True
+    return json.loads(meta_path.read_bytes()) != _fingerprints(data_dir)
+
+
+class TermStore:
+    def __init__(self, terms: pl.DataFrame):
+        self.terms = terms
+        self._keys: dict[str, pl.DataFrame] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.terms.height
+
+    @property
+    def sheets(self) -> list[str]:
+        return self.terms["sheet"].unique(maintain_order=True).to_list()
+
+    def keys(self, lang: str) -> pl.DataFrame:
+        # 언어마다 소문자로 정렬한 색인, 처음 찾을 때 만들어서 이분 탐색에 쓴다
+        with self._lock:
+            index = self._keys.get(lang)
+            if index is None:
+                key = pl.col(lang).str.to_lowercase()
+                index = (
+                    self.terms.lazy()
+                    .select(key.alias("_key"))
+                    .with_row_index("_id")
+                    .filter(
+                        pl.col("_key").ne("")
+                        & ~pl.col("_key").str.starts_with(RSV_PREFIX)
+                    )
+                    .sort("_key")
+                    .collect()
+                )
+                self._keys[lang] = index
+        return index
+
+    def search(
+        self,
+        queries: Iterable[str],
+        source: str = "en",
+        targets: Iterable[str] | None = None,
+        match: Match = Match.exact,
+        sheets: Iterable[str] | None = None,
+        limit: int | None = None,
+    ) -> pl.DataFrame:
+        match = Match(match)
+        targets = list(LANG) if targets is None else list(dict.fromkeys(targets))
+        unknown = [lang for lang in [source, *targets] if lang not in LANG]
+        if unknown:
+            msg = (
+                f"unknown language {', '.join(unknown)}, choose from {', '.join(LANG)}"
+            )
+            raise ValueError(msg)
+        sheets = None if sheets is None else list(sheets)
+        if sheets is not None:
+            unknown = [name for name in sheets if name not in SHEETS]
+            if unknown:
+                msg = f"unknown sheet: {', '.join(unknown)}, choose from {', '.join(SHEETS)}"
+                raise ValueError(msg)
+
+        with span("lookup", match=str(match)) as attrs:
+            index = self.keys(source)
+            query = pl.DataFrame(
+                {"query": list(queries)}, schema={"query": pl.String}
+            ).with_row_index("_q")
+            lower = query["query"].str.to_lowercase()
+            upper = lower + MAX_CHAR if match is Match.prefix else lower
+            start = index["_key"].search_sorted(lower, "left")
+            end = index["_key"].search_sorted(upper, "right")
+            if limit is not None and match is not Match.exact and sheets is None:
+                # 나중에 걸러낼 것이 없으면 펼치기 전에 범위를 줄인다
+                end = pl.select(pl.min_horizontal(end, start + limit)).to_series()
+
+            hits = (
+                query.with_columns(
+                    pl.int_ranges(start, end, dtype=pl.UInt32).alias("_pos")
+                )
+                .explode("_pos")
+                .drop_nulls("_pos")
+            )
+            # _id는 terms의 행 번호라서 join 없이 바로 가져온다
+            ids = index["_id"].gather(hits["_pos"])
+            df = pl.concat(
+                [hits.select("_q", "query"), self.terms[ids]],
+                how="horizontal",
+            )
+            if match is Match.exact:
+                df = df.filter(pl.col(source) == pl.col("query"))
+            if sheets is not None:
+                df = df.filter(pl.col("sheet").is_in(sheets))
+            if limit is not None:
+                df = df.filter(pl.int_range(pl.len()).over("_q") < limit)
+            columns = list(dict.fromkeys([source, *targets]))
+            df = df.select("query", "sheet", "field", "row", *columns)
+            attrs.update(queries=query.height, rows=df.height)
+        return df
+
+    def lookup_many(
+        self, queries: Iterable[str], *args, **kwargs
+    ) -> dict[str, list[dict[str, object]]]:
+        queries = list(dict.fromkeys(queries))
+        result: dict[str, list[dict[str, object]]] = {query: [] for query in queries}
+        for row in self.search(queries, *args, **kwargs).iter_rows(named=True):
+            query = row.pop("query")
+            result[query].append(row)
+        return result
+
+    def lookup(self, query: str, *args, **kwargs) -> list[dict[str, object]]:
+        return self.lookup_many([query], *args, **kwargs)[query]
+
+
+def load_store(data_dir: str | os.PathLike[str] = "coinach") -> TermStore:
+    # coinach 결과 폴더에서 모든 시트, 모든 언어를 한 번에 읽고 바뀌었을 때만 다시 만든다
+    data_dir = Path(data_dir)
+    if is_stale(data_dir):
+        compile_store(data_dir)
+    path = store_path(data_dir)
+    with span("read", path=str(path), bytes=path.stat().st_size) as attrs:
+        terms = pl.read_ipc(path)
+        attrs["rows"] = terms.height
+    return TermStore(terms)
@@ -0,0 +1,19 @@
+from bingkit.ffxiv._base.metrics import (
+    Metrics,
+    Span,
+    current_metrics,
+    profile,
+    run_in_executor,
+    span,
+    tags,
+)
+
+__all__ = [
+    "Metrics",
+    "Span",
+    "current_metrics",
+    "profile",
+    "run_in_executor",
+    "span",
+    "tags",
+]
@@ -1,3 +1,4 @@
+from .batch import batch
 from .raidboss import raidboss
 
-__all__ = ["raidboss"]
+__all__ = ["batch", "raidboss"]
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import asyncio
+import glob
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+from fsspec.core import url_to_fs
+from loguru import logger
+from tqdm.auto import tqdm
+from upath import UPath
+
+from bingkit.ffxiv._base import run_in_executor, span, tags
+from bingkit.ffxiv.coinach.index import load_index
+
+from .raidboss import fetch, parse, to_i18n_data, to_ts
+
+REMOTE_PROTOCOLS = ("http", "https")
+
+
+def is_batch_input(item: str) -> bool:
+    if glob.has_magic(item):
+        return True
+    path = UPath(item)
+    return path.protocol not in REMOTE_PROTOCOLS and path.is_dir()
+
+
+def _root(item: str, path: str) -> str:
+    # glob이면 패턴이 시작되기 전까지의 폴더를 기준으로 삼는다
+    if not glob.has_magic(item):
+        return path
+    parts = path.split("/")
+    index = next(i for i, part in enumerate(parts) if glob.has_magic(part))
+    return "/".join(parts[:index])
+
+
+def expand(inputs: list[str]) -> dict[str, str]:
+    # url마다 출력 폴더 아래에 쓸 상대 경로, 입력 폴더의 하위 구조를 그대로 유지한다
+    urls: dict[str, str] = {}
+    for item in inputs:
+        if not is_batch_input(item):
+            urls[item] = UPath(item).name
+            continue
+        fs, path = url_to_fs(item)
+        root = _root(item, path).rstrip("/")
+        found = fs.glob(path) if glob.has_magic(item) else fs.find(path)
+        for p in sorted(found):
+            if p.endswith(".ts") and fs.isfile(p):
+                relative = p[len(root) + 1 :] if root else p.lstrip("/")
+                urls[fs.unstrip_protocol(p)] = relative
+    return urls
+
+
+def _check_duplicates(urls: dict[str, str]) -> None:
+    seen: dict[str, str] = {}
+    for url, relative in urls.items():
+        other = seen.setdefault(relative, url)
+        if other != url:
+            msg = f"{other!r} and {url!r} would both be saved as {relative!r}"
+            raise ValueError(msg)
+
+
+async def _one(
+    url: str,
+    save_path: Path,
+    coinach_dir: str | Path,
+    limit: asyncio.Semaphore,
+    pool: Executor,
+) -> Path | None:
+    with tags(url=url):
+        async with limit:
+            data = await asyncio.to_thread(fetch, url)
+        parsed = await run_in_executor(pool, parse, data)
+        i18n_all = await asyncio.to_thread(to_i18n_data, parsed, coinach_dir)
+        result = "\n".join(to_ts(i18n_all))
+
+        source = UPath(url)
+        is_local = source.protocol in ("", "file")
+        if is_local and Path(source.path).resolve() == save_path.resolve():
+            logger.warning(f"skip {url}: output would overwrite the input file")
+            return None
+        save_path.parent.mkdir(parents=True, exist_ok=True)
+        with span("write", path=str(save_path), bytes=len(result.encode())):
+            await asyncio.to_thread(save_path.write_text, result, encoding="utf-8")
+    return save_path
+
+
+async def _run_one(url: str, failed: list[str], *args, **kwargs) -> Path | None:
+    # 타임라인 하나가 실패해도 다른 타임라인은 계속 진행한다
+    try:
+        return await _one(url, *args, **kwargs)
+    except Exception as e:
+        logger.exception(f"{url}: {e}")
+        failed.append(url)
+        return None
+
+
+async def batch(
+    inputs: list[str],
+    output_dir: str | os.PathLike[str] | None = None,
+    coinach_dir: str | Path = "coinach",
+    concurrency: int = 8,
+    workers: int | None = None,
+) -> list[Path]:
+    output_dir = Path.cwd() if output_dir is None else Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    urls = expand(inputs)
+    if not urls:
+        logger.warning("no timeline found")
+        return []
+    _check_duplicates(urls)
+
+    # 모든 타임라인이 같은 인덱스를 쓰도록 미리 불러온다
+    load_index(coinach_dir, "Action")
+    load_index(coinach_dir, "BNpcName")
+
+    start = time.perf_counter()
+    limit = asyncio.Semaphore(concurrency)
+    # polars는 fork 이후 멈출 수 있으므로 spawn을 쓴다
+    pool: Executor = (
+        ThreadPoolExecutor(1)
+        if workers == 0
+        else ProcessPoolExecutor(
+            workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    )
+    failed: list[str] = []
+    tasks = []
+    pbar = tqdm(total=len(urls), desc="Raidboss")
+    try:
+        with pool:
+            async with asyncio.TaskGroup() as tg:
+                for url, relative in urls.items():
+                    save_path = output_dir.joinpath(relative)
+                    coro = _run_one(url, failed, save_path, coinach_dir, limit, pool)
+                    task = tg.create_task(coro)
+                    task.add_done_callback(lambda _: pbar.update(1))
+                    tasks.append(task)
+    finally:
+        pbar.close()
+
+    saved = [path for task in tasks if (path := task.result()) is not None]
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    logger.info(
+        f"{len(urls)} timelines in {elapsed:.2f}s ({len(urls) / elapsed:.2f} timelines/s)"
+    )
+    if failed:
+        logger.error(f"{len(failed)} timelines failed: {', '.join(failed)}")
+    return saved
@@ -1,15 +1,34 @@
 import re
 from dataclasses import dataclass
+from pathlib import Path
 from typing import TypedDict, cast
 
 import json5
 import polars as pl
 from upath import UPath
 
+from bingkit.ffxiv._base import span
+from bingkit.ffxiv.coinach.index import load_index
+
 ts_object = re.compile(r"\{[^}]*\}")
 quoted = re.compile(r"\"([^\"]+)\"")
 multiplier = re.compile(r"\s*x\d+$")
 label = re.compile(r"^\d+(?:\.\d+)?\s*label")
+digit = re.compile(r"\d")
+
+# json5 없이 읽을 수 있는 단순한 객체: 따옴표 문자열, 숫자, true/false/null과 그 배열
+_ws = r"[ \t]*"
+_string = r"'[^'\\\n]*'|\"[^\"\\\n]*\""
+_scalar = rf"{_string}|-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?|true|false|null"
+_array = rf"\[{_ws}(?:(?:{_scalar}){_ws},{_ws})*(?:(?:{_scalar}){_ws},?{_ws})?\]"
+_value = rf"{_scalar}|{_array}"
+_key = rf"[A-Za-z_$][A-Za-z0-9_$]*|{_string}"
+_member = rf"(?:{_key}){_ws}:{_ws}(?:{_value})"
+simple_object = re.compile(
+    rf"\{{{_ws}(?:{_member}{_ws},{_ws})*(?:{_member}{_ws},?{_ws})?\}}"
+)
+simple_member = re.compile(rf"(?P<key>{_key}){_ws}:{_ws}(?P<value>{_value})")
+simple_string = re.compile(_string)
 
 
 @dataclass
@@ -56,25 +75,26 @@ def german_substitute(name: str) -> str:
     return name
 
 
-def add_to_set(s: set[str], item: str | list[str]) -> set[str]:
-    s = s.copy()
+def add_to_set(s: set[str], item: object) -> None:
     if isinstance(item, list):
         for i in item:
-            s.add(i.strip())
-    else:
+            if isinstance(i, str):
+                s.add(i.strip())
+    elif isinstance(item, str):
         s.add(item.strip())
-    return s
 
 
 def fetch(url: str) -> RaidbossData:
     ts_url = UPath(url).with_suffix(".ts")
     txt_url = UPath(url).with_suffix(".txt")
 
-    ts_data = ts_url.read_text(encoding="utf-8")
-    try:
-        txt_data = txt_url.read_text(encoding="utf-8")
-    except FileNotFoundError:
-        txt_data = ""
+    with span("fetch", url=url) as attrs:
+        ts_data = ts_url.read_text(encoding="utf-8")
+        try:
+            txt_data = txt_url.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            txt_data = ""
+        attrs["bytes"] = len(ts_data.encode()) + len(txt_data.encode())
     return RaidbossData(ts=ts_data, txt=txt_data)
 
 
@@ -87,45 +107,105 @@ def pp_action(s: str) -> list[str]:
     return s.split("/")
 
 
+def parse_object(text: str) -> dict[str, object] | None:
+    if simple_object.fullmatch(text):
+        obj = {}
+        for m in simple_member.finditer(text):
+            key = m.group("key")
+            if key[0] in "'\"":
+                key = key[1:-1]
+            value = m.group("value")
+            if value[0] == "[":
+                obj[key] = [s[1:-1] for s in simple_string.findall(value)]
+            elif value[0] in "'\"":
+                obj[key] = value[1:-1]
+            else:
+                obj[key] = None
+        return obj
+    try:
+        obj = json5.loads(text)
+    except json5.JSON5DecodeError:
+        return None
+    return obj if isinstance(obj, dict) else None
+
+
+def add_npc_names(bnpcname: set[str], text: str) -> None:
+    obj = parse_object(text)
+    if obj is None:
+        return
+    for key in npc_name_keys:
+        if key in obj:
+            add_to_set(bnpcname, obj[key])
+
+
+def strip_multiplier(s: str, times: int) -> str:
+    for _ in range(times):
+        stripped = multiplier.sub("", s)
+        if stripped == s:
+            break
+        s = stripped
+    return s
+
+
 def parse(data: RaidbossData) -> ParsedData:
-    action = set()
-    bnpcname = set()
+    with span("parse", bytes=len(data.ts.encode()) + len(data.txt.encode())) as attrs:
+        parsed = _parse(data)
+        attrs["rows"] = len(parsed.action) + len(parsed.bnpcname)
+    return parsed
+
+
+def _parse(data: RaidbossData) -> ParsedData:
+    bnpcname: set[str] = set()
     for line in data.ts.splitlines():
         m = ts_object.search(line)
-        if not m:
-            continue
-        try:
-            obj = json5.loads(m.group())
-        except json5.JSON5DecodeError:
-            continue
-        for key in npc_name_keys:
-            if key in obj:
-                bnpcname = add_to_set(bnpcname, obj[key])
+        if m:
+            add_npc_names(bnpcname, m.group())
 
+    # 배수 표기(x2)는 원래 유효한 줄마다 한 번씩 지워졌으므로,
+    # 추가된 뒤 남은 줄 수만큼만 지워서 같은 결과를 만든다
+    added: list[tuple[str, int]] = []
+    lines = 0
     for line in data.txt.splitlines():
-        if not re.match(r"^\d", line) or label.match(line):
+        if not digit.match(line) or label.match(line):
             continue
         m1 = quoted.search(line)
         if m1:
-            s = pp_action(m1.group(1))
-            action = add_to_set(action, s)
-        action = {multiplier.sub("", a) for a in action}
+            added.extend((a.strip(), lines) for a in pp_action(m1.group(1)))
+        lines += 1
         m2 = ts_object.search(line)
         if m2:
-            try:
-                obj = json5.loads(m2.group())
-            except json5.JSON5DecodeError:
-                continue
-            for key in npc_name_keys:
-                if key in obj:
-                    bnpcname = add_to_set(bnpcname, obj[key])
+            add_npc_names(bnpcname, m2.group())
 
+    action = {strip_multiplier(a, lines - n) for a, n in added}
     return ParsedData(action=sorted(action), bnpcname=sorted(bnpcname))
 
 
-def to_i18n_data(data: ParsedData) -> RaidbossDataDict:
-    actions: pl.DataFrame = pl.read_excel("coinach/Action.all.xlsx")
-    b_npc_names: pl.DataFrame = pl.read_excel("coinach/BNpcName.all.xlsx")
+def lookup(index: pl.DataFrame, terms: list[str]) -> dict[str, dict[str, str]]:
+    terms_df = pl.DataFrame({"term": terms}, schema={"term": pl.String}).with_columns(
+        pl.col("term").str.to_lowercase().alias("_key")
+    )
+    # 일치하는 행이 없으면 "", 있지만 값이 비어있으면 None
+    joined = terms_df.join(index, on="_key", how="left").select(
+        "term",
+        *(
+            pl.when(pl.col("_hit").is_null())
+            .then(pl.lit(""))
+            .otherwise(pl.col(lang))
+            .alias(lang)
+            for lang in langs[1:]
+        ),
+    )
+    result = {}
+    for lang in langs[1:]:
+        result[lang] = dict(zip(joined["term"], joined[lang]))
+    return result
+
+
+def to_i18n_data(
+    data: ParsedData, coinach_dir: str | Path = "coinach"
+) -> RaidbossDataDict:
+    actions = load_index(coinach_dir, "Action")
+    b_npc_names = load_index(coinach_dir, "BNpcName")
 
     result = {"en": PairData(action={}, bnpcname={})}
     for act in data.action:
@@ -133,27 +213,16 @@ def to_i18n_data(data: ParsedData) -> RaidbossDataDict:
     for bnpc in data.bnpcname:
         result["en"].bnpcname[bnpc] = bnpc
 
-    for i, lang in enumerate(langs[1:]):
-        action: dict[str, str] = {}
-        bnpcname: dict[str, str] = {}
-        df = actions.select(pl.nth(0, i + 1))
-        for act in data.action:
-            row = df.filter(pl.nth(0).str.to_lowercase() == act.lower())
-            if row.is_empty():
-                action[act] = ""
-            else:
-                action[act] = row.item(-1, 1)
-
-        df = b_npc_names.select(pl.nth(0, i + 1))
-        for bnpc in data.bnpcname:
-            row = df.filter(pl.nth(0).str.to_lowercase() == bnpc.lower())
-            if row.is_empty():
-                bnpcname[bnpc] = ""
-            else:
-                bnpcname[bnpc] = row.item(-1, 1)
-            if lang == "de":
-                bnpcname[bnpc] = german_substitute(bnpcname[bnpc])
-        result[lang] = PairData(action=action, bnpcname=bnpcname)
+    with span("lookup", rows=len(data.action) + len(data.bnpcname)):
+        action_all = lookup(actions, data.action)
+        bnpcname_all = lookup(b_npc_names, data.bnpcname)
+    for lang in langs[1:]:
+        bnpcname = bnpcname_all[lang]
+        if lang == "de":
+            bnpcname = {
+                k: v if v is None else german_substitute(v) for k, v in bnpcname.items()
+            }
+        result[lang] = PairData(action=action_all[lang], bnpcname=bnpcname)
 
     return cast(RaidbossDataDict, result)
 
@@ -187,9 +256,9 @@ def to_ts(data: RaidbossDataDict) -> list[str]:
     return r
 
 
-def raidboss(url: str) -> str:
+def raidboss(url: str, coinach_dir: str | Path = "coinach") -> str:
     data = fetch(url)
     parsed = parse(data)
-    i18n_all = to_i18n_data(parsed)
+    i18n_all = to_i18n_data(parsed, coinach_dir)
     ts_lines = to_ts(i18n_all)
     return "\n".join(ts_lines)
@@ -1,4 +1,13 @@
-from .__main__ import parse_log
+from typing import TYPE_CHECKING
+
+from bingkit.ffxiv._lazy import lazy_exports
+
+from .__main__ import follow, parse_log
 from .replace import replace
 
-__all__ = ["parse_log", "replace"]
+if TYPE_CHECKING:
+    from .store import RsvStore
+
+__all__ = ["RsvStore", "follow", "parse_log", "replace"]
+
+__getattr__, __dir__ = lazy_exports(__name__, {"RsvStore": ".store"})
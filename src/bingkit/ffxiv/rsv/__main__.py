@@ -1,12 +1,18 @@
 from __future__ import annotations
 
-import fileinput
 import glob
 import json
 import re
+import time
 from pathlib import Path
 from typing import NamedTuple
 
+from loguru import logger
+
+from bingkit.ffxiv._base.metrics import span
+
+from .scan import ScanState, scan_files
+
 
 class RSVData(NamedTuple):
     key: str
@@ -32,26 +38,14 @@ def convert_files(patterns: list[str]) -> list[Path]:
     ]
 
 
-def parse_log(file_patterns: list[str], save_path: str | Path | None):
-    save_path = Path("rsv.json") if save_path is None else Path(save_path)
-    mapping = {}
-
-    converted_files = convert_files(file_patterns)
-    if not converted_files:
-        return
-
-    with fileinput.input(files=converted_files, encoding="utf-8") as files:
-        for line in files:
-            if not is_rsv_line(line):
-                continue
-            rsv = parse_rsv_line(line)
-            mapping[rsv.key] = rsv.value
-
+def sort_mapping(mapping: dict[str, str]) -> dict[str, str]:
     def sort_key(item: tuple[str, str]):
         return (int(item[0].split("_")[2]), item)
 
-    mapping = dict(sorted(mapping.items(), key=sort_key))
+    return dict(sorted(mapping.items(), key=sort_key))
 
+
+def write_mapping(mapping: dict[str, str], save_path: Path) -> None:
     with save_path.open("w", encoding="utf-8") as file:
         json.dump(mapping, file, indent=2, ensure_ascii=False)
 
@@ -60,3 +54,104 @@ def parse_log(file_patterns: list[str], save_path: str | Path | None):
         for key, value in mapping.items():
             value = re.sub(r"\s", " ", value)
             file.write(f"{key}|{value}\n")
+
+
+def state_path(save_path: Path) -> Path:
+    return save_path.with_suffix(".state.json")
+
+
+def parse_log(
+    file_patterns: list[str],
+    save_path: str | Path | None,
+    workers: int | None = None,
+    incremental: bool = False,
+    store: str | Path | None = None,
+    version: str | None = None,
+    lang: str | None = None,
+) -> int:
+    save_path = Path("rsv.json") if save_path is None else Path(save_path)
+    mapping = {}
+
+    converted_files = convert_files(file_patterns)
+    if not converted_files:
+        return 0
+
+    state = spans = None
+    if incremental:
+        state = ScanState(state_path(save_path))
+        # 결과 파일이 없으면 이전 위치부터 읽을 수 없으므로 처음부터 다시 읽는다
+        if save_path.exists():
+            with save_path.open("rb") as file:
+                mapping = json.load(file)
+        else:
+            state.files.clear()
+        spans = state.spans(converted_files)
+
+    lines = scan_files(converted_files, workers, spans=spans)
+    for line in lines:
+        rsv = parse_rsv_line(line)
+        mapping[rsv.key] = rsv.value
+
+    if state is not None and spans is not None:
+        state.commit(spans)
+        if not lines and save_path.exists():
+            state.save()
+            return 0
+
+    with span("write", path=str(save_path), rows=len(mapping)):
+        write_mapping(sort_mapping(mapping), save_path)
+    if store is not None:
+        update_store(store, mapping, save_path, version, lang)
+    if state is not None:
+        state.save()
+    return len(lines)
+
+
+def update_store(
+    store: str | Path,
+    mapping: dict[str, str],
+    save_path: Path,
+    version: str | None = None,
+    lang: str | None = None,
+) -> None:
+    from .store import RsvStore, infer_source
+
+    # 버전과 언어를 정하지 않으면 저장 파일 이름에서 추측한다 (rsv7_2.json -> 7.2)
+    inferred_version, inferred_lang = infer_source(save_path)
+    version = inferred_version if version is None else version
+    lang = inferred_lang if lang is None else lang
+    rsv_store = RsvStore(store)
+    with span("write", path=str(rsv_store.path), rows=len(mapping)):
+        inserted, updated = rsv_store.add(mapping, version, lang)
+        rsv_store.save()
+    logger.info(
+        f"{rsv_store.path}: {inserted} new, {updated} updated as {version}/{lang}"
+    )
+
+
+def follow(
+    file_patterns: list[str],
+    save_path: str | Path | None,
+    interval: float = 5.0,
+    workers: int | None = None,
+    store: str | Path | None = None,
+    version: str | None = None,
+    lang: str | None = None,
+) -> None:
+    logger.info(f"following {file_patterns}, press Ctrl+C to stop")
+    try:
+        while True:
+            count = parse_log(
+                file_patterns,
+                save_path,
+                workers,
+                incremental=True,
+                store=store,
+                version=version,
+                lang=lang,
+            )
+            if count:
+                logger.info(f"{count} new rsv records")
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
@@ -1,29 +1,147 @@
+from __future__ import annotations
+
 import asyncio
-import asyncio.taskgroups as taskgroups
+import glob
 import json
+import multiprocessing
 import os
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+from loguru import logger
+
+from bingkit.ffxiv._base import SUFFIXES, OutputFormat
+from bingkit.ffxiv._base.metrics import run_in_executor, span, tags
+
+if TYPE_CHECKING:
+    import polars as pl
 
-import polars as pl
-import polars.selectors as cs
-from tqdm.auto import tqdm
+RSV_PREFIX = "_rsv_"
+
+_mapping: pl.DataFrame | None = None
 
 
 def get_rsv_mapping(path: str | os.PathLike[str]) -> dict[str, str]:
-    with Path(path).open("rb") as file:
-        return json.load(file)
+    path = Path(path)
+    if path.suffix == OutputFormat.ipc.suffix:
+        # rsv-store 명령으로 만든 저장소, 모든 언어에서 키마다 가장 최신 버전의 값을 쓴다
+        from .store import RsvStore
+
+        rsv_mapping = RsvStore(path).mapping(lang=None)
+        logger.info(f"rsv mapping: {len(rsv_mapping)} keys from store {path}")
+        return rsv_mapping
+    with path.open("rb") as file:
+        rsv_mapping = json.load(file)
+    logger.info(f"rsv mapping: {len(rsv_mapping)} keys from {path}")
+    return rsv_mapping
+
+
+def load_rsv_mapping(paths: Iterable[str | os.PathLike[str]]) -> dict[str, str]:
+    # 여러 파일이 같은 키를 가지면 뒤에 오는 파일의 값을 쓴다
+    rsv_mapping: dict[str, str] = {}
+    for path in paths:
+        path = os.fspath(path)
+        files = sorted(glob.glob(path)) if glob.has_magic(path) else [path]
+        for file in files:
+            rsv_mapping.update(get_rsv_mapping(file))
+    return rsv_mapping
+
+
+def mapping_frame(rsv_mapping: dict[str, str]) -> pl.DataFrame:
+    import polars as pl
+
+    return pl.DataFrame(
+        {"key": list(rsv_mapping), "value": list(rsv_mapping.values())},
+        schema={"key": pl.String, "value": pl.String},
+    )
+
+
+def replace_series(series: pl.Series, mapping: pl.DataFrame) -> tuple[pl.Series, int]:
+    candidates = series.str.starts_with(RSV_PREFIX).fill_null(False)
+    if not candidates.any():
+        return series, 0
+    idx = candidates.arg_true()
+    matched = (
+        series.gather(idx)
+        .to_frame("key")
+        .join(mapping, on="key", how="left", maintain_order="left")
+    )
+    hits = matched["value"].is_not_null()
+    count = int(hits.sum())
+    if count == 0:
+        return series, 0
+    idx = idx.filter(hits)
+    values = matched["value"].filter(hits)
+    return series.clone().scatter(idx, values), count
 
 
-async def replace_one(path: str | os.PathLike[str], rsv_mapping: dict[str, str]):
-    df = await asyncio.to_thread(pl.read_excel, Path(path))
-    df = df.with_columns(cs.string().replace(rsv_mapping))
-    await asyncio.to_thread(df.write_excel, Path(path))
+def replace_frame(df: pl.DataFrame, mapping: pl.DataFrame) -> tuple[pl.DataFrame, int]:
+    import polars as pl
+
+    total = 0
+    columns = []
+    with span("replace", rows=df.height) as attrs:
+        for name, dtype in df.schema.items():
+            if dtype != pl.String:
+                continue
+            series, count = replace_series(df[name], mapping)
+            if count:
+                total += count
+                columns.append(series)
+        attrs["cells"] = total
+    if not columns:
+        return df, 0
+    return df.with_columns(columns), total
+
+
+def _init_worker(rsv_mapping: dict[str, str]) -> None:
+    global _mapping
+    _mapping = mapping_frame(rsv_mapping)
+
+
+def replace_one(
+    path: str | os.PathLike[str], mapping: pl.DataFrame | None = None
+) -> int:
+    mapping = _mapping if mapping is None else mapping
+    if mapping is None:
+        msg = "rsv mapping is not initialized"
+        raise RuntimeError(msg)
+    from bingkit.ffxiv._base import read_file, write_frame
+
+    path = Path(path)
+    with tags(path=str(path)):
+        # 같은 파일에 다시 쓰므로 메모리 맵 없이 읽는다
+        df, count = replace_frame(read_file(path, memory_map=False), mapping)
+        if count:
+            write_frame(df, path, [OutputFormat.from_path(path)])
+    return count
+
+
+# 데이터 폴더 안에 있지만 데이터 파일이 아닌 것: raidboss 인덱스, lookup store
+ARTIFACTS = ("*.index.arrow", "lookup.arrow")
+
+
+def data_files(data_dir: Path) -> list[Path]:
+    # manifest의 .parts 같은 숨김 폴더, 임시 파일과 인덱스는 건드리지 않는다
+    files = []
+    for suffix in SUFFIXES:
+        for path in data_dir.rglob(f"*{suffix}"):
+            parts = path.relative_to(data_dir).parts
+            if any(part.startswith(".") for part in parts):
+                continue
+            if any(path.match(pattern) for pattern in ARTIFACTS):
+                continue
+            files.append(path)
+    return files
 
 
 async def replace(
     data_dir: str | os.PathLike[str] | None = None,
     rsv_path: str | os.PathLike[str] | None = None,
-):
+    workers: int | None = None,
+) -> dict[Path, int]:
     data_dir = Path("data") if data_dir is None else Path(data_dir)
     rsv_path = Path("rsv.json") if rsv_path is None else Path(rsv_path)
 
@@ -31,12 +149,31 @@ async def replace(
         msg = f"{rsv_path!r} does not exist"
         raise FileNotFoundError(msg)
 
+    from tqdm.auto import tqdm
+
     rsv_mapping = get_rsv_mapping(rsv_path)
-    files = list(data_dir.rglob("*.xlsx"))
+    files = data_files(data_dir)
     pbar = tqdm(total=len(files), desc="RSV Replacing")
-    async with taskgroups.TaskGroup() as tg:
+    # polars는 fork 이후 멈출 수 있으므로 spawn을 쓴다
+    with ProcessPoolExecutor(
+        workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(rsv_mapping,),
+    ) as pool:
+        futures = []
         for path in files:
-            coro = replace_one(path, rsv_mapping)
-            task = tg.create_task(coro)
-            task.add_done_callback(lambda _: pbar.update(1))
+            # 프로세스 안에서 기록한 span도 함께 모은다
+            fut = asyncio.ensure_future(run_in_executor(pool, replace_one, path))
+            fut.add_done_callback(lambda _: pbar.update(1))
+            futures.append(fut)
+        counts = await asyncio.gather(*futures)
     pbar.close()
+
+    report = dict(zip(files, counts))
+    for path, count in sorted(report.items()):
+        if count:
+            logger.info(f"{path}: {count} cells replaced")
+        else:
+            logger.info(f"{path}: no rsv cells, skipped")
+    return report
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from loguru import logger
+
+from bingkit.ffxiv._base.metrics import span
+
+RSV_PREFIX = b"262|"
+CHUNK_SIZE = 64 * 1024**2
+
+
+def _line(mm: mmap.mmap, start: int) -> bytes:
+    end = mm.find(b"\n", start)
+    line = mm[start:] if end == -1 else mm[start:end]
+    return line.removesuffix(b"\r")
+
+
+def _records(mm: mmap.mmap, start: int, end: int) -> Iterator[bytes]:
+    # [start, end) 안에서 시작하는 262| 줄만 찾는다, 줄 끝은 범위를 넘어가도 된다
+    if start == 0 and mm[: len(RSV_PREFIX)] == RSV_PREFIX:
+        yield _line(mm, 0)
+    pattern = b"\n" + RSV_PREFIX
+    bound = end - 2 + len(pattern)
+    pos = mm.find(pattern, max(start - 1, 0), bound)
+    while pos != -1:
+        yield _line(mm, pos + 1)
+        pos = mm.find(pattern, pos + 1, bound)
+
+
+def scan_range(path: str | os.PathLike[str], start: int, end: int) -> list[str]:
+    with Path(path).open("rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return [
+                line.decode("utf-8", errors="replace")
+                for line in _records(mm, start, end)
+            ]
+
+
+def split_ranges(
+    files: list[Path],
+    chunk_size: int = CHUNK_SIZE,
+    spans: dict[Path, tuple[int, int]] | None = None,
+) -> list[tuple[Path, int, int]]:
+    ranges = []
+    for path in files:
+        if spans is None:
+            start, end = 0, path.stat().st_size
+        else:
+            start, end = spans.get(path, (0, 0))
+        for chunk_start in range(start, end, chunk_size):
+            ranges.append((path, chunk_start, min(chunk_start + chunk_size, end)))
+    return ranges
+
+
+def scan_files(
+    files: list[Path],
+    workers: int | None = None,
+    chunk_size: int = CHUNK_SIZE,
+    spans: dict[Path, tuple[int, int]] | None = None,
+) -> list[str]:
+    ranges = split_ranges(files, chunk_size, spans)
+    nbytes = sum(end - start for _path, start, end in ranges)
+    with span("parse", files=len(files), bytes=nbytes) as attrs:
+        if workers == 1 or len(ranges) <= 1:
+            lines = [line for args in ranges for line in scan_range(*args)]
+        else:
+            paths, starts, ends = zip(*ranges)
+            with ProcessPoolExecutor(workers) as pool:
+                results = pool.map(scan_range, paths, starts, ends)
+                lines = [line for chunk in results for line in chunk]
+        attrs["rows"] = len(lines)
+    return lines
+
+
+def complete_end(path: Path, size: int, block: int = 1 << 16) -> int:
+    # 아직 쓰는 중인 마지막 줄은 빼고, 마지막 줄바꿈 바로 뒤의 위치
+    with path.open("rb") as file:
+        end = size
+        while end > 0:
+            start = max(end - block, 0)
+            file.seek(start)
+            pos = file.read(end - start).rfind(b"\n")
+            if pos != -1:
+                return start + pos + 1
+            end = start
+    return 0
+
+
+def head_digest(path: Path, size: int = 64) -> str:
+    with path.open("rb") as file:
+        return hashlib.sha1(file.read(size)).hexdigest()
+
+
+@dataclass
+class FileState:
+    inode: int
+    head: str
+    offset: int
+
+
+class ScanState:
+    def __init__(self, path: str | os.PathLike[str]):
+        self.path = Path(path)
+        self.files: dict[str, FileState] = {}
+        if not self.path.exists():
+            return
+        try:
+            raw = json.loads(self.path.read_bytes())
+            self.files = {k: FileState(**v) for k, v in raw["files"].items()}
+        except (json.JSONDecodeError, TypeError, KeyError, AttributeError):
+            # 쓰다가 끊긴 파일 등, 처음부터 다시 읽는다
+            logger.warning(f"broken scan state {self.path}, rescanning all logs")
+            self.files = {}
+
+    def spans(self, files: list[Path]) -> dict[Path, tuple[int, int]]:
+        result = {}
+        for path in files:
+            stat = path.stat()
+            prev = self.files.get(str(path.resolve()))
+            start = 0
+            if (
+                prev is not None
+                and prev.inode == stat.st_ino
+                and prev.offset <= stat.st_size
+                and prev.head == head_digest(path)
+            ):
+                start = prev.offset
+            result[path] = (start, complete_end(path, stat.st_size))
+        return result
+
+    def commit(self, spans: dict[Path, tuple[int, int]]) -> None:
+        for path, (start, end) in spans.items():
+            self.files[str(path.resolve())] = FileState(
+                inode=path.stat().st_ino,
+                head=head_digest(path),
+                offset=max(start, end),
+            )
+
+    def save(self) -> None:
+        data = {"files": {k: asdict(v) for k, v in self.files.items()}}
+        tmp = self.path.with_name(f".{self.path.name}.tmp")
+        tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        tmp.replace(self.path)
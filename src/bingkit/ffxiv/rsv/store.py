@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+
+import polars as pl
+from loguru import logger
+
+DEFAULT_STORE = Path("rsv", "store.arrow")
+DEFAULT_LANG = "en"
+KEYS = ["key", "version", "lang"]
+
+SCHEMA = {
+    "key": pl.String,
+    "id": pl.Int64,
+    "version": pl.String,
+    "lang": pl.String,
+    "value": pl.String,
+    # 원본 파일에서의 순서, 내보낼 때 원본과 같은 순서로 쓴다
+    "order": pl.Int64,
+}
+
+# rsv7_2.json -> 7.2, en / rsv7_2_ko.json -> 7.2, ko
+_file_name = re.compile(r"rsv(?P<major>\d+)_(?P<minor>\d+)(?:_(?P<lang>[a-z]+))?")
+
+
+def infer_source(path: str | os.PathLike[str]) -> tuple[str, str]:
+    stem = Path(path).stem
+    if m := _file_name.fullmatch(stem):
+        return f"{m['major']}.{m['minor']}", m["lang"] or DEFAULT_LANG
+    return stem, DEFAULT_LANG
+
+
+def version_order(version: str) -> tuple[int, tuple[int, ...] | str]:
+    # 숫자 버전은 숫자 순서로, 이름만 있는 스냅샷(rsv.json 등)은 가장 최신으로 본다
+    parts = version.split(".")
+    if all(part.isdigit() for part in parts):
+        return 0, tuple(int(part) for part in parts)
+    return 1, version
+
+
+def read_txt(path: str | os.PathLike[str]) -> dict[str, str]:
+    mapping = {}
+    with Path(path).open(encoding="utf-8") as file:
+        for line in file:
+            key, sep, value = line.rstrip("\n").partition("|")
+            if sep:
+                mapping[key] = value
+    return mapping
+
+
+def read_mapping(path: str | os.PathLike[str]) -> dict[str, str]:
+    path = Path(path)
+    if path.suffix == ".txt":
+        return read_txt(path)
+    with path.open("rb") as file:
+        return json.load(file)
+
+
+def to_frame(mapping: Mapping[str, str], version: str, lang: str) -> pl.DataFrame:
+    df = pl.DataFrame(
+        {"key": list(mapping), "value": list(mapping.values())},
+        schema={"key": pl.String, "value": pl.String},
+    )
+    return df.select(
+        "key",
+        pl.col("key")
+        .str.split("_")
+        .list.get(2, null_on_oob=True)
+        .cast(pl.Int64, strict=False)
+        .alias("id"),
+        pl.lit(version, pl.String).alias("version"),
+        pl.lit(lang, pl.String).alias("lang"),
+        "value",
+        pl.int_range(pl.len(), dtype=pl.Int64).alias("order"),
+    )
+
+
+def is_store(path: str | os.PathLike[str]) -> bool:
+    # 데이터 파일도 .arrow이므로 열 이름으로 구분한다
+    path = Path(path)
+    if path.suffix != DEFAULT_STORE.suffix or not path.exists():
+        return False
+    return {*KEYS, "value"} <= set(pl.read_ipc_schema(path))
+
+
+class RsvStore:
+    def __init__(self, path: str | os.PathLike[str] | None = None):
+        self.path = DEFAULT_STORE if path is None else Path(path)
+        if self.path.exists():
+            self.df = pl.read_ipc(self.path)
+            if "order" not in self.df.columns:
+                # order 열이 생기기 전에 만든 저장소
+                self.df = self.df.with_columns(pl.lit(None, pl.Int64).alias("order"))
+        else:
+            self.df = pl.DataFrame(schema=SCHEMA)
+
+    def __len__(self) -> int:
+        return self.df.height
+
+    def versions(self) -> list[str]:
+        return sorted(self.df["version"].unique().to_list(), key=version_order)
+
+    def langs(self) -> list[str]:
+        return sorted(self.df["lang"].unique().to_list())
+
+    def merge(self, other: RsvStore | pl.DataFrame) -> tuple[int, int]:
+        # 같은 (key, version, lang)은 나중에 들어온 값을 쓴다
+        # 새로 들어간 행 수와 값이 바뀐 행 수를 돌려준다
+        other_df = other.df if isinstance(other, RsvStore) else other
+        other_df = other_df.select(list(SCHEMA)).unique(KEYS, keep="last")
+        joined = other_df.join(
+            self.df.select(*KEYS, pl.col("value").alias("_old"), _hit=True),
+            on=KEYS,
+            how="left",
+        )
+        hit = pl.col("_hit").fill_null(False)
+        counts = joined.select(
+            (~hit).sum().alias("inserted"),
+            (hit & pl.col("value").ne_missing(pl.col("_old"))).sum().alias("updated"),
+        ).row(0)
+        self.df = (
+            pl.concat([self.df, other_df])
+            .unique(KEYS, keep="last")
+            .sort("key", "version", "lang")
+        )
+        return counts
+
+    def add(
+        self, mapping: Mapping[str, str], version: str, lang: str = DEFAULT_LANG
+    ) -> tuple[int, int]:
+        return self.merge(to_frame(mapping, version, lang))
+
+    def import_file(
+        self,
+        path: str | os.PathLike[str],
+        version: str | None = None,
+        lang: str | None = None,
+    ) -> tuple[int, int]:
+        inferred_version, inferred_lang = infer_source(path)
+        version = inferred_version if version is None else version
+        lang = inferred_lang if lang is None else lang
+        inserted, updated = self.add(read_mapping(path), version, lang)
+        logger.info(f"{path}: {inserted} new, {updated} updated as {version}/{lang}")
+        return inserted, updated
+
+    def get(self, key: str) -> pl.DataFrame:
+        # key로 정렬되어 있으므로 이진 탐색으로 범위를 찾는다
+        keys = self.df["key"]
+        start = keys.search_sorted(key, side="left")
+        end = keys.search_sorted(key, side="right")
+        return self.df.slice(start, end - start)
+
+    def lookup(self, keys: Iterable[str]) -> pl.DataFrame:
+        query = pl.DataFrame({"key": list(keys)}, schema={"key": pl.String})
+        return query.join(self.df, on="key", how="inner", maintain_order="left")
+
+    def mapping(
+        self, version: str | None = None, lang: str | None = DEFAULT_LANG
+    ) -> dict[str, str]:
+        # lang이 None이면 모든 언어의 키를 쓴다, 언어마다 키가 다르므로 겹치지 않는다
+        df = self.df if lang is None else self.df.filter(pl.col("lang") == lang)
+        if version is not None:
+            df = df.filter(pl.col("version") == version)
+            if lang is not None:
+                # 파일 하나에서 온 값이므로 가져온 순서를 그대로 쓴다
+                df = df.sort("order", "id", "key", nulls_last=True)
+                return dict(zip(df["key"], df["value"]))
+        else:
+            # 버전을 정하지 않으면 키마다 가장 최신 버전의 값을 쓴다
+            rank = {v: i for i, v in enumerate(self.versions())}
+            df = (
+                df.with_columns(
+                    pl.col("version")
+                    .replace_strict(rank, return_dtype=pl.Int64)
+                    .alias("_rank")
+                )
+                .sort("_rank")
+                .unique("key", keep="last")
+            )
+        df = df.sort("id", "key", nulls_last=True)
+        return dict(zip(df["key"], df["value"]))
+
+    def export(
+        self,
+        path: str | os.PathLike[str],
+        version: str | None = None,
+        lang: str = DEFAULT_LANG,
+    ) -> int:
+        path = Path(path)
+        mapping = self.mapping(version, lang)
+        if path.suffix == ".txt":
+            with path.open("w", encoding="utf-8") as file:
+                for key, value in mapping.items():
+                    value = re.sub(r"\s", " ", value)
+                    file.write(f"{key}|{value}\n")
+        else:
+            with path.open("w", encoding="utf-8") as file:
+                json.dump(mapping, file, indent=2, ensure_ascii=False)
+        return len(mapping)
+
+    def save(self, path: str | os.PathLike[str] | None = None) -> Path:
+        path = self.path if path is None else Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.tmp")
+        self.df.write_ipc(tmp, compression="zstd")
+        tmp.replace(path)
+        return path
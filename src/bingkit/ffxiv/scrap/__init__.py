@@ -1,3 +1,3 @@
-from .scrapper import scrap
+from .scrapper import DEFAULT_WRITE_CONCURRENCY, Pipeline, scrap
 
-__all__ = ["scrap"]
+__all__ = ["DEFAULT_WRITE_CONCURRENCY", "Pipeline", "scrap"]
@@ -3,52 +3,236 @@ from __future__ import annotations
 import asyncio
 import asyncio.taskgroups as taskgroups
 import json
+from collections.abc import Iterable, Mapping
 from pathlib import Path
 
 import polars as pl
+from loguru import logger
 from tqdm.auto import tqdm
 
-from bingkit.ffxiv._base import BASE_URL, get_csv
+from bingkit.ffxiv._base import (
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_PARSE_CONCURRENCY,
+    DEFAULT_PER_HOST,
+    DEFAULT_WRITE_CONCURRENCY,
+    RETRY_ATTEMPTS,
+    CsvCache,
+    Manifest,
+    MemoryBudget,
+    OutputFormat,
+    Source,
+    download_session,
+    fetch_sheet,
+    get_source,
+    join_languages,
+    parse_slot,
+    span,
+    tags,
+    use_sources,
+    write_frame,
+)
+from bingkit.ffxiv.rsv.replace import load_rsv_mapping, mapping_frame, replace_frame
 
 here = Path(__file__).parent
 
+LANGS = ("en", "ko")
+STAGES = ("download", "parse", "write")
+# 캐시에 없는 시트의 언어당 예상 크기
+SHEET_ESTIMATE = 32 * 1024**2
 
-async def make_df(name: str, columns: list[str], save_dir: Path) -> None:
+
+class Pipeline:
+    def __init__(
+        self,
+        total: int = 0,
+        write_concurrency: int = DEFAULT_WRITE_CONCURRENCY,
+        memory_budget: int | None = None,
+        progress: bool = True,
+    ):
+        self.budget = MemoryBudget(memory_budget)
+        self.write_limit = asyncio.Semaphore(write_concurrency)
+        self.bars = {
+            stage: tqdm(
+                total=total * len(LANGS) if stage == "download" else total,
+                desc=stage.capitalize(),
+                position=i,
+                disable=not progress,
+            )
+            for i, stage in enumerate(STAGES)
+        }
+
+    def update(self, stage: str) -> None:
+        self.bars[stage].update()
+
+    def close(self) -> None:
+        for bar in self.bars.values():
+            bar.close()
+
+
+def estimate_size(name: str) -> int:
+    total = 0
+    for lang in LANGS:
+        size = get_source(lang).size(name, lang)
+        total += SHEET_ESTIMATE if size is None else size
+    return total
+
+
+async def _get_sheet(
+    name: str,
+    lang: str,
+    columns: list[str],
+    pipeline: Pipeline,
+    manifest: Manifest | None = None,
+    attempts: int = RETRY_ATTEMPTS,
+) -> pl.DataFrame | pl.LazyFrame | None:
+    df = await fetch_sheet(name, lang, columns, manifest, attempts)
+    pipeline.update("download")
+    if df is None or manifest is None:
+        return df
+    # 받은 시트는 .parts에 저장되어 있으므로 메모리에서 내리고 합칠 때 파일에서 읽는다
+    return manifest.scan_part(name, lang)
+
+
+def _frame_size(
+    frame: pl.DataFrame | pl.LazyFrame, name: str, lang: str, manifest: Manifest | None
+) -> int:
+    # 파일에서 읽을 시트는 파일 크기로 어림한다
+    if isinstance(frame, pl.LazyFrame):
+        return 0 if manifest is None else manifest.part_size(name, lang)
+    return frame.estimated_size()
+
+
+def _build(
+    name: str,
+    frames: dict[str, pl.DataFrame | pl.LazyFrame],
+    rsv_mapping: pl.DataFrame | None,
+) -> tuple[pl.DataFrame, int]:
+    with tags(sheet=name):
+        with span("join") as attrs:
+            df = join_languages(frames)
+            attrs.update(rows=df.height, bytes=df.estimated_size())
+        if rsv_mapping is None:
+            return df, 0
+        return replace_frame(df, rsv_mapping)
+
+
+async def make_df(
+    name: str,
+    columns: list[str],
+    save_dir: Path,
+    formats: Iterable[OutputFormat] = (OutputFormat.xlsx,),
+    rsv_mapping: pl.DataFrame | None = None,
+    pipeline: Pipeline | None = None,
+    manifest: Manifest | None = None,
+    attempts: int = RETRY_ATTEMPTS,
+) -> int | None:
+    pipeline = Pipeline(progress=False) if pipeline is None else pipeline
     columns = ["#", *columns]
-    langs = ("en", "ko")
 
-    tasks = []
-    async with taskgroups.TaskGroup() as tg:
-        for lang in langs:
-            usecols = columns if lang == "en" else columns[1:]
-            coro = get_csv(BASE_URL[lang].format(name=name), usecols)
-            tasks.append(tg.create_task(coro))
+    # 메모리 예산에 여유가 있을 때만 시트를 받기 시작한다
+    async with pipeline.budget.reserve(estimate_size(name)) as reservation:
+        tasks = {}
+        async with taskgroups.TaskGroup() as tg:
+            for lang in LANGS:
+                coro = _get_sheet(name, lang, columns, pipeline, manifest, attempts)
+                tasks[lang] = tg.create_task(coro)
+        frames = {lang: task.result() for lang, task in tasks.items()}
+        if any(df is None for df in frames.values()):
+            return None
+        await reservation.resize(
+            sum(
+                _frame_size(frame, name, lang, manifest)
+                for lang, frame in frames.items()
+            )
+        )
+
+        async with parse_slot():
+            df, count = await asyncio.to_thread(_build, name, frames, rsv_mapping)
+        del frames, tasks
+        await reservation.resize(df.estimated_size())
+        pipeline.update("parse")
 
-    dfs: list[pl.DataFrame] = [task.result() for task in tasks]
-    for i, (lang, df) in enumerate(zip(langs, dfs)):
-        rename = {col: f"{col}_{lang}" for col in df.columns}
-        rename["#"] = "#"
-        dfs[i] = dfs[i].rename(mapping=rename)
+        async with pipeline.write_limit:
+            save_path = save_dir.joinpath(name)
+            saved = await asyncio.to_thread(write_frame, df, save_path, formats)
+        pipeline.update("write")
+    if manifest is not None:
+        manifest.finish(name, saved, LANGS)
+    return count
 
-    df = pl.concat(dfs, how="horizontal")
-    save_path = save_dir.joinpath(f"{name}.xlsx")
-    await asyncio.to_thread(df.write_excel, save_path)
+
+async def _run_sheet(name: str, manifest: Manifest, *args, **kwargs) -> int | None:
+    # 시트 하나가 실패해도 다른 시트는 계속 진행한다
+    try:
+        return await make_df(name, *args, manifest=manifest, **kwargs)
+    except Exception as e:
+        logger.exception(f"{name}: {e}")
+        manifest.fail(Manifest.key(name), e)
+        return None
 
 
 async def scrap(
-    config_path: str | Path | None = None, save_dir: str | Path | None = None
-):
+    config_path: str | Path | None = None,
+    save_dir: str | Path | None = None,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    per_host: int = DEFAULT_PER_HOST,
+    cache: CsvCache | None = None,
+    formats: Iterable[OutputFormat] = (OutputFormat.xlsx,),
+    rsv_paths: Iterable[str | Path] | None = None,
+    parse_concurrency: int = DEFAULT_PARSE_CONCURRENCY,
+    write_concurrency: int = DEFAULT_WRITE_CONCURRENCY,
+    memory_budget: int | None = None,
+    resume: bool = False,
+    attempts: int = RETRY_ATTEMPTS,
+    sources: Mapping[str, Source | str] | None = None,
+) -> dict[str, str | None]:
     config_path = (
         here.joinpath("default.json") if config_path is None else Path(config_path)
     )
     config: dict[str, list[str]] = json.loads(config_path.read_bytes())
     save_dir = Path.cwd().joinpath("data") if save_dir is None else Path(save_dir)
     save_dir.mkdir(parents=True, exist_ok=True)
+    rsv_mapping = None
+    if rsv_paths:
+        rsv_mapping = mapping_frame(load_rsv_mapping(rsv_paths))
+
+    manifest = Manifest(save_dir, resume)
+    todo = {
+        name: columns for name, columns in config.items() if not manifest.is_done(name)
+    }
+    if len(todo) < len(config):
+        logger.info(f"resume: {len(config) - len(todo)} sheets already done")
+    manifest.save()
+
+    tasks = []
+    pipeline = Pipeline(len(todo), write_concurrency, memory_budget)
+    # 로컬 폴더로 지정한 언어는 다운로드 없이 파일을 바로 읽는다
+    with use_sources(sources):
+        async with (
+            download_session(max_concurrency, per_host, cache, parse_concurrency),
+            taskgroups.TaskGroup() as tg,
+        ):
+            for name, columns in todo.items():
+                coro = _run_sheet(
+                    name,
+                    manifest,
+                    columns,
+                    save_dir,
+                    formats,
+                    rsv_mapping,
+                    pipeline,
+                    attempts=attempts,
+                )
+                tasks.append(tg.create_task(coro))
+    pipeline.close()
+
+    if rsv_mapping is not None:
+        total = sum(task.result() or 0 for task in tasks)
+        logger.info(f"{total} rsv cells replaced")
 
-    pbar = tqdm(total=len(config), desc="Scraping")
-    async with taskgroups.TaskGroup() as tg:
-        for name, columns in config.items():
-            coro = make_df(name, columns, save_dir)
-            task = tg.create_task(coro)
-            task.add_done_callback(lambda _: pbar.update(1))
-    pbar.close()
+    failed = manifest.failed()
+    if failed:
+        logger.error(
+            f"{len(failed)} items failed, run again with --resume: {', '.join(failed)}"
+        )
+    return failed